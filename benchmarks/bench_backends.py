@@ -0,0 +1,52 @@
+"""Compare embedding backends for speed and agreement with the fp32 model.
+
+Every backend embeds the same fixed corpus; agreement is the cosine between
+its vectors and the torch (fp32) vectors for each chunk. The fastest backend
+whose worst-case agreement stays above --tolerance is recommended.
+
+Usage: python -m benchmarks.bench_backends [--chunks 512] [--batch-size 32]
+                                           [--backends torch,int8,onnx] [--tolerance 0.99]
+"""
+import argparse
+
+from benchmarks.common import synthetic_chunks, timed
+from core.backends import get_backend
+from core.embedding import embed_texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backends", default="torch,int8,onnx")
+    parser.add_argument("--tolerance", type=float, default=0.99, help="minimum cosine agreement with fp32")
+    args = parser.parse_args()
+
+    chunks = synthetic_chunks(args.chunks)
+    reference = get_backend("torch")
+    embed_texts(chunks[:2], backend=reference)  # warm up
+    expected, _ = timed(embed_texts, chunks, batch_size=args.batch_size, backend=reference)
+
+    results = []
+    for name in args.backends.split(","):
+        try:
+            backend = get_backend(name)
+        except RuntimeError as e:
+            print(f"{name:<6}: skipped ({e})")
+            continue
+        embed_texts(chunks[:2], backend=backend)
+        vectors, seconds = timed(embed_texts, chunks, batch_size=args.batch_size, backend=backend)
+        agreement = (vectors * expected).sum(axis=1)
+        ok = agreement.min() >= args.tolerance
+        results.append((len(chunks) / seconds, name, ok))
+        print(f"{name:<6}: {len(chunks) / seconds:8.1f} chunks/sec  "
+              f"cosine mean {agreement.mean():.5f} min {agreement.min():.5f}  {'ok' if ok else 'OUT OF TOLERANCE'}")
+
+    passing = [result for result in results if result[2]]
+    if passing:
+        rate, name, _ = max(passing)
+        print(f"fastest within tolerance: {name} ({rate:.1f} chunks/sec)")
+
+
+if __name__ == "__main__":
+    main()
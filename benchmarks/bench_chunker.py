@@ -0,0 +1,66 @@
+"""Compare the character chunker with the token-aware chunker on a large synthetic PDF.
+
+Reports chunking time and how many chunks exceed the model's token limit
+(text the embedder would silently truncate).
+
+Usage: python -m benchmarks.bench_chunker [--pages 2000]
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import synthetic_pdf, timed
+from core.chunker import chunk_pages
+from core.config import CHUNK_MAX_TOKENS
+from core.models import get_tokenizer
+from core.parser import iter_page_texts
+
+
+def char_chunks(texts, max_chunk_size=700):
+    """The pre-token-aware baseline: pack non-empty lines into chunks of up to max_chunk_size characters."""
+    current_chunk = ""
+
+    for text in texts:
+        for para in text.split('\n'):
+            para = para.strip()
+            if not para:
+                continue
+            if len(current_chunk) + len(para) < max_chunk_size:
+                current_chunk += para + "\n"
+            else:
+                if current_chunk:
+                    yield current_chunk.strip()
+                current_chunk = para + "\n"
+
+    if current_chunk:
+        yield current_chunk.strip()
+
+
+def over_limit(tokenizer, texts, limit):
+    lengths = [len(ids) for ids in tokenizer(["passage: " + text for text in texts])["input_ids"]]
+    return sum(length > limit for length in lengths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=2000)
+    args = parser.parse_args()
+
+    tokenizer = get_tokenizer()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.pdf")
+        synthetic_pdf(path, args.pages)
+        pages, extract = timed(lambda: list(iter_page_texts(path)))
+
+    legacy, legacy_time = timed(lambda: list(char_chunks(text for _, text in pages)))
+    chunks, token_time = timed(chunk_pages, pages, tokenizer=tokenizer)
+
+    print(f"extract    : {len(pages)} pages in {extract:.2f}s")
+    print(f"char-based : {len(legacy):6d} chunks in {legacy_time:.2f}s, "
+          f"{over_limit(tokenizer, legacy, CHUNK_MAX_TOKENS)} over {CHUNK_MAX_TOKENS} tokens")
+    print(f"token-aware: {len(chunks):6d} chunks in {token_time:.2f}s, "
+          f"{over_limit(tokenizer, [c.text for c in chunks], CHUNK_MAX_TOKENS)} over {CHUNK_MAX_TOKENS} tokens")
+
+
+if __name__ == "__main__":
+    main()
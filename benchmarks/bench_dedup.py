@@ -0,0 +1,45 @@
+"""Time duplicate detection on a synthetic corpus with repeated boilerplate.
+
+Each of --files sources gets --chunks unique chunks, a shared block of
+--boilerplate legal/appendix chunks, and near copies (one word changed) of
+a few of those. Prints the dedup_chunks time and its savings report.
+
+Usage: python -m benchmarks.bench_dedup [--files 50] [--chunks 200] [--boilerplate 20]
+"""
+import argparse
+import random
+
+from benchmarks.common import WORDS, synthetic_chunks, timed
+from core.dedup import dedup_chunks, format_stats
+
+
+def corpus(files: int, chunks: int, boilerplate: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    shared = synthetic_chunks(boilerplate, min_words=80, max_words=140, seed=seed + 1)
+    chunks_map = {}
+    for i in range(files):
+        texts = synthetic_chunks(chunks, seed=seed + 100 + i) + shared
+        for text in rng.sample(shared, min(3, len(shared))):
+            words = text.split()
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            texts.append(" ".join(words))
+        chunks_map[f"doc{i}.pdf"] = texts
+    return chunks_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--chunks", type=int, default=200, help="unique chunks per file")
+    parser.add_argument("--boilerplate", type=int, default=20, help="chunks repeated in every file")
+    parser.add_argument("--dim", type=int, default=768, help="vector size used for the storage estimate")
+    args = parser.parse_args()
+
+    chunks_map = corpus(args.files, args.chunks, args.boilerplate)
+    (_, _, stats), seconds = timed(dedup_chunks, chunks_map)
+    print(f"{stats['chunks']} chunks deduplicated in {seconds:.2f}s ({stats['chunks'] / seconds:.0f} chunks/sec)")
+    print(format_stats(stats, args.dim))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""End-to-end benchmark: parse -> embed -> upload on synthetic PDFs.
+
+Generates --files PDFs of --pages pages in --language, then times
+parse_multiple_pdfs, generate_embeddings_for_chunks and
+upload_embeddings_to_qdrant (against in-memory Qdrant) with the parse and
+embedding caches off. Writes JSON with per-stage seconds, throughput, peak
+RSS and latency histograms from the core.profiling spans.
+
+With --baseline, a stage whose throughput falls more than --tolerance below
+the stored baseline fails the run (exit code 1); --save-baseline stores one.
+
+Usage: python -m benchmarks.bench_e2e [--files 8] [--pages 20] [--language en]
+                                      [--workers 1] [--output result.json]
+                                      [--baseline baseline.json] [--tolerance 0.2] [--save-baseline FILE]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+
+# Measure real work, not cache hits.
+os.environ["EMBED_CACHE_PATH"] = ""
+os.environ["PARSE_CACHE_PATH"] = ""
+os.environ.setdefault("COLLECTION_NAME", "d2v_bench")
+
+from benchmarks.common import LANGUAGES, synthetic_pdf, timed  # noqa: E402
+from core import profiling  # noqa: E402
+from core.embedding import generate_embeddings_for_chunks, upload_embeddings_to_qdrant  # noqa: E402
+from core.parser import parse_multiple_pdfs  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(max(own, children) / (1024 * 1024), 1)
+
+
+def run(args) -> dict:
+    from qdrant_client import QdrantClient
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(folder, f"doc{i}.pdf")
+            synthetic_pdf(path, args.pages, seed=i, language=args.language)
+            paths.append(path)
+
+        generate_embeddings_for_chunks(["warm up"], cache=None)
+        profiling.reset()
+        profiling.enable()
+
+        stages = {}
+        chunks_map, seconds = timed(parse_multiple_pdfs, paths, workers=args.workers)
+        pages = args.files * args.pages
+        stages["parse"] = {"seconds": seconds, "items": pages, "unit": "pages", "peak_rss_mb": peak_rss_mb()}
+
+        chunks = [chunk for file_chunks in chunks_map.values() for chunk in file_chunks]
+        embeddings, seconds = timed(generate_embeddings_for_chunks, chunks, batch_size=args.batch_size)
+        stages["embed"] = {"seconds": seconds, "items": len(chunks), "unit": "chunks", "peak_rss_mb": peak_rss_mb()}
+
+        client = QdrantClient(":memory:")
+        _, seconds = timed(upload_embeddings_to_qdrant, embeddings, client=client)
+        stages["upload"] = {"seconds": seconds, "items": len(chunks), "unit": "points", "peak_rss_mb": peak_rss_mb()}
+
+    for stage in stages.values():
+        stage["throughput"] = round(stage["items"] / stage["seconds"], 2) if stage["seconds"] else 0.0
+        stage["seconds"] = round(stage["seconds"], 4)
+    return {
+        "config": {"files": args.files, "pages": args.pages, "language": args.language,
+                   "workers": args.workers, "batch_size": args.batch_size},
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+        "spans": profiling.summary(),
+    }
+
+
+def regressions(result: dict, baseline: dict, tolerance: float) -> list:
+    found = []
+    for name, stage in baseline["stages"].items():
+        current = result["stages"].get(name)
+        if current and current["throughput"] < stage["throughput"] * (1 - tolerance):
+            found.append(f"{name}: {current['throughput']} {current['unit']}/s vs baseline {stage['throughput']}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--language", default="en", choices=sorted(LANGUAGES))
+    parser.add_argument("--workers", type=int, default=1, help="parser processes")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report to compare throughput against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop vs baseline")
+    parser.add_argument("--save-baseline", metavar="FILE", help="also store this run as a baseline")
+    args = parser.parse_args()
+
+    # Status lines from core go to stderr so stdout stays valid JSON.
+    with contextlib.redirect_stdout(sys.stderr):
+        result = run(args)
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+    for name, stage in result["stages"].items():
+        print(f"{name:<7}: {stage['throughput']:10.1f} {stage['unit']}/s  peak RSS {stage['peak_rss_mb']} MB",
+              file=sys.stderr)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(report)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(result, json.load(f), args.tolerance)
+        for line in found:
+            print(f"❌ Regression in {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+        print("✅ No regressions against the baseline.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
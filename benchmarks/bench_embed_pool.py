@@ -0,0 +1,44 @@
+"""Measure how embedding throughput scales with the number of worker processes.
+
+Runs the same corpus through an EmbeddingPool of 1, 2, 4 ... N workers
+(each pinned to cpu_count // workers cores) and reports chunks/sec,
+speedup over one worker and parallel efficiency.
+
+Usage: python -m benchmarks.bench_embed_pool [--chunks 2048] [--batch-size 32] [--max-workers N]
+"""
+import argparse
+import os
+
+from benchmarks.common import synthetic_chunks, timed
+from core.embed_pool import EmbeddingPool
+from core.embedding import embed_texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    chunks = synthetic_chunks(args.chunks)
+    counts = []
+    workers = 1
+    while workers < args.max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.max_workers)
+
+    baseline = None
+    for workers in counts:
+        with EmbeddingPool(workers) as pool:
+            embed_texts(chunks[:workers * 2], batch_size=2, backend=pool)  # warm up every worker
+            _, seconds = timed(embed_texts, chunks, batch_size=args.batch_size, backend=pool)
+        rate = len(chunks) / seconds
+        baseline = baseline or rate
+        print(f"workers={workers:<3} threads={pool.threads:<3}: {rate:8.1f} chunks/sec  "
+              f"speedup {rate / baseline:5.2f}x  efficiency {rate / baseline / workers:5.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compare per-chunk embedding throughput against the batched engine.
+
+Usage: python -m benchmarks.bench_embedding [--chunks 512] [--batch-size 32]
+"""
+import argparse
+
+from benchmarks.common import synthetic_chunks, timed
+from core.embedding import embed_texts
+from core.models import get_model
+
+
+def embed_per_chunk(chunks):
+    """The loop embed_texts replaced: one tokenizer call and one forward pass per chunk."""
+    import torch
+
+    tokenizer, model = get_model()
+    results = []
+    for chunk in chunks:
+        inputs = tokenizer(f"passage: {chunk}", return_tensors="pt", padding=True, truncation=True)
+        with torch.no_grad():
+            outputs = model(**inputs)
+            embeddings = outputs.last_hidden_state.mean(dim=1)
+            normalized = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        results.append(normalized[0].tolist())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    chunks = synthetic_chunks(args.chunks)
+    embed_per_chunk(chunks[:2])  # warm up
+    embed_texts(chunks[:2])
+
+    _, per_chunk = timed(embed_per_chunk, chunks)
+    _, batched = timed(embed_texts, chunks, batch_size=args.batch_size)
+
+    print(f"per-chunk : {len(chunks) / per_chunk:8.1f} chunks/sec")
+    print(f"batch={args.batch_size:<4}: {len(chunks) / batched:8.1f} chunks/sec")
+    print(f"speedup   : {per_chunk / batched:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
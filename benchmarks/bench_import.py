@@ -0,0 +1,50 @@
+"""Measure cold import time of the core modules in a fresh interpreter.
+
+Fails (exit status 1) when the import takes longer than the target or pulls
+in a heavy dependency that should only load on first use.
+
+Usage: python -m benchmarks.bench_import [--target-ms 500] [--runs 5]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = ["core.embedding", "core.pipeline", "core.parser"]
+HEAVY = ["torch", "transformers", "qdrant_client"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure():
+    code = PROBE.format(modules=MODULES, heavy=HEAVY)
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [measure() for _ in range(args.runs)]
+    best = min(result["ms"] for result in results)
+    heavy = sorted({name for result in results for name in result["heavy"]})
+
+    print(f"import {', '.join(MODULES)}: best of {args.runs} = {best:.0f} ms (target {args.target_ms:.0f} ms)")
+    if heavy:
+        print(f"eagerly imported: {', '.join(heavy)}")
+    if best > args.target_ms or heavy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Parse a mix of text-layer and scanned PDFs and report each lane's throughput.
+
+Scanned fixtures are synthetic pages rendered to images, so they have no
+text layer. Prints the batch time with and without the scanned files, plus
+the per-lane rates from parse_multiple_pdfs. Needs Tesseract for the OCR
+lane.
+
+Usage: python -m benchmarks.bench_ocr [--text-files 8] [--scanned-files 2] [--pages 10]
+                                      [--ocr-workers 2] [--language en]
+"""
+import argparse
+import os
+import tempfile
+
+os.environ["PARSE_CACHE_PATH"] = ""
+
+from benchmarks.common import LANGUAGES, scanned_pdf, synthetic_pdf, timed  # noqa: E402
+from core.parser import ocr_available, parse_multiple_pdfs  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--text-files", type=int, default=8)
+    parser.add_argument("--scanned-files", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--ocr-workers", type=int, default=2)
+    parser.add_argument("--language", default="en", choices=sorted(LANGUAGES))
+    args = parser.parse_args()
+
+    if not ocr_available():
+        print("⚠️ Tesseract not found; scanned pages will come back empty.")
+
+    with tempfile.TemporaryDirectory() as folder:
+        text_files, scanned_files = [], []
+        for i in range(args.text_files):
+            text_files.append(os.path.join(folder, f"text{i}.pdf"))
+            synthetic_pdf(text_files[-1], args.pages, seed=i, language=args.language)
+        for i in range(args.scanned_files):
+            scanned_files.append(os.path.join(folder, f"scan{i}.pdf"))
+            scanned_pdf(scanned_files[-1], args.pages, seed=100 + i, language=args.language)
+
+        _, text_only = timed(parse_multiple_pdfs, text_files, ocr_workers=args.ocr_workers)
+        result, mixed = timed(parse_multiple_pdfs, scanned_files + text_files, ocr_workers=args.ocr_workers)
+
+    scanned_chunks = sum(len(result[os.path.basename(path)]) for path in scanned_files)
+    print(f"text files only      : {text_only:6.2f}s")
+    print(f"text + scanned files : {mixed:6.2f}s ({scanned_chunks} chunks from scans)")
+
+
+if __name__ == "__main__":
+    main()
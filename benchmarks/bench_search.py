@@ -0,0 +1,65 @@
+"""Latency and recall of the local IVF index against exact (brute-force) search.
+
+Vectors are drawn around random cluster centres, like real embeddings, and
+queries are perturbed copies of stored vectors. Recall@k is the share of the
+exact top k that the IVF search also returns.
+
+Usage: python -m benchmarks.bench_search [--vectors 100000] [--dim 768] [--queries 200] [--k 10]
+                                         [--nprobe 8,16,32,64]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from core.search import LocalIndex
+from core.vectors import EmbeddingBatch
+
+
+def clustered_vectors(count, dim, clusters=500, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = centres[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def run(index, queries, k, **kwargs):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search_vector(query, k, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        results.append({hit["text"] for hit in hits})
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default="8,16,32,64")
+    args = parser.parse_args()
+
+    vectors = clustered_vectors(args.vectors, args.dim)
+    batch = EmbeddingBatch([str(i) for i in range(args.vectors)], vectors)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, args.vectors, args.queries)] + 0.3 * rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    exact = LocalIndex.build(batch, ivf_threshold=args.vectors + 1)
+    start = time.perf_counter()
+    ivf = LocalIndex.build(batch, ivf_threshold=0)
+    print(f"IVF build : {time.perf_counter() - start:.1f}s for {args.vectors} vectors, {len(ivf.centroids)} lists")
+
+    latencies, truth = run(exact, queries, args.k)
+    print(f"exact     : p50 {np.percentile(latencies, 50):7.2f} ms  p99 {np.percentile(latencies, 99):7.2f} ms  recall@{args.k} 1.000")
+    for nprobe in map(int, args.nprobe.split(",")):
+        latencies, found = run(ivf, queries, args.k, nprobe=nprobe)
+        recall = np.mean([len(a & b) / len(a) for a, b in zip(truth, found)])
+        print(f"nprobe={nprobe:<3}: p50 {np.percentile(latencies, 50):7.2f} ms  p99 {np.percentile(latencies, 99):7.2f} ms  recall@{args.k} {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Time the extractive summarizer on synthetic embeddings.
+
+Builds --chunks normalised vectors spread over --documents documents, each
+document drawn around a few topic centres, and times summarize_embeddings
+with every selection method. No model is loaded: the summarizer only reads
+vectors that were already computed.
+
+Usage: python -m benchmarks.bench_summarizer [--chunks 10000] [--documents 1] [--dim 768] [-k 5]
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import synthetic_chunks, timed
+from core.summarizer import summarize_embeddings
+from core.vectors import EmbeddingBatch
+
+
+def synthetic_embeddings(chunks: int, documents: int, dim: int, topics: int = 8, seed: int = 0) -> EmbeddingBatch:
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((topics, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, topics, chunks)] + rng.standard_normal((chunks, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    sources = [f"doc{i * documents // chunks}.pdf" for i in range(chunks)]
+    return EmbeddingBatch(synthetic_chunks(chunks, seed=seed), vectors, sources)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=10000)
+    parser.add_argument("--documents", type=int, default=1)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("-k", type=int, default=5, help="excerpts per document")
+    args = parser.parse_args()
+
+    embeddings = synthetic_embeddings(args.chunks, args.documents, args.dim)
+    print(f"{args.chunks} chunks in {args.documents} document(s), dim {args.dim}, k={args.k}")
+    for method in ("centrality", "mmr", "kmeans", "auto"):
+        summaries, seconds = timed(summarize_embeddings, embeddings, args.k, method)
+        excerpts = sum(len(texts) for texts in summaries.values())
+        print(f"{method:<10}: {seconds * 1000:8.1f} ms  ({excerpts} excerpts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import random
+import time
+
+WORDS = (
+    "vector document index model query section table figure page result "
+    "system value method analysis data report manual chapter appendix note"
+).split()
+
+
+# Vocabulary, word separator, sentence end and built-in PyMuPDF font per language.
+LANGUAGES = {
+    "en": (WORDS, " ", ".", "helv"),
+    "de": ("dokument vektor modell abfrage abschnitt tabelle abbildung seite ergebnis system "
+           "wert methode analyse daten bericht handbuch kapitel anhang hinweis prüfung".split(), " ", ".", "helv"),
+    "fr": ("document vecteur modèle requête section tableau figure page résultat système "
+           "valeur méthode analyse données rapport manuel chapitre annexe note élément".split(), " ", ".", "helv"),
+    "es": ("documento vector modelo consulta sección tabla figura página resultado sistema "
+           "valor método análisis datos informe manual capítulo anexo nota año".split(), " ", ".", "helv"),
+    "zh": (list("文档向量模型查询章节表格图页结果系统数值方法分析数据报告手册附录说明"), "", "。", "china-s"),
+    "ja": (list("文書ベクトルモデル検索表図結果方法分析データ報告手引き章付録注記"), "", "。", "japan"),
+}
+
+
+def synthetic_chunks(count, min_words=20, max_words=140, seed=0):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+        for _ in range(count)
+    ]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def synthetic_pdf(path, pages, seed=0, sentences_per_page=40, language="en"):
+    """Write a PDF with a numbered heading every third page and paragraphs of random sentences."""
+    import fitz
+
+    words, space, stop, font = LANGUAGES[language]
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for number in range(pages):
+        sentences = []
+        for _ in range(sentences_per_page):
+            sentence = space.join(rng.choice(words) for _ in range(rng.randint(6, 24)))
+            sentences.append(sentence.capitalize() + stop)
+        text = space.join(sentences)
+        if number % 3 == 0:
+            text = f"{number // 3 + 1}. {rng.choice(words).title()} {rng.choice(words).title()}\n{text}"
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(40, 40, 555, 800), text, fontsize=8, fontname=font)
+    doc.save(path)
+    doc.close()
+
+
+def scanned_pdf(path, pages, seed=0, language="en", dpi=150):
+    """Write an image-only PDF: each page of a synthetic_pdf rendered to a picture."""
+    import fitz
+
+    text_path = f"{path}.text.pdf"
+    synthetic_pdf(text_path, pages, seed=seed, language=language)
+    source = fitz.open(text_path)
+    doc = fitz.open()
+    for page in source:
+        pixmap = page.get_pixmap(dpi=dpi)
+        scan = doc.new_page(width=page.rect.width, height=page.rect.height)
+        scan.insert_image(scan.rect, pixmap=pixmap)
+    doc.save(path)
+    doc.close()
+    source.close()
+    os.remove(text_path)
@@ -0,0 +1,79 @@
+"""Load-test a running embedding server (`python d2v.py serve`) on localhost.
+
+Opens --concurrency keep-alive connections that each send single-query
+/embed requests. --repeat is the share of queries drawn from a small hot set
+(to exercise the LRU cache). Prints client-side p50/p99 latency and QPS, then
+the server's own /metrics.
+
+Usage: python -m benchmarks.load_test [--url http://127.0.0.1:8765] [--requests 2000]
+                                      [--concurrency 32] [--repeat 0.3]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from benchmarks.common import synthetic_chunks
+
+
+async def request(reader, writer, host, method, path, body=None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n") if line.lower().startswith(b"content-length"))
+    return json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, queries, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for query in queries:
+            start = time.perf_counter()
+            await request(reader, writer, host, "POST", "/embed", {"text": query})
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    url = urlparse(args.url)
+    rng = random.Random(0)
+    fresh = synthetic_chunks(args.requests, min_words=3, max_words=12, seed=1)
+    hot = fresh[:20]
+    queries = [rng.choice(hot) if rng.random() < args.repeat else fresh[i] for i in range(args.requests)]
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(url.hostname, url.port, queries[i::args.concurrency], latencies)
+        for i in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    print(f"client : {len(ms)} requests in {elapsed:.2f}s  {len(ms) / elapsed:8.1f} QPS  "
+          f"p50 {np.percentile(ms, 50):.2f} ms  p99 {np.percentile(ms, 99):.2f} ms")
+    reader, writer = await asyncio.open_connection(url.hostname, url.port)
+    print("server :", json.dumps(await request(reader, writer, url.hostname, "GET", "/metrics")))
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--repeat", type=float, default=0.3, help="share of queries from a hot set")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# core/backends.py
+
+"""Inference backends for the embedder.
+
+A backend turns a padded batch of token ids into L2-normalised sentence
+vectors. "torch" runs the full-precision model, "int8" the same model with
+its Linear layers dynamically quantized, and "onnx" an exported copy of the
+model under ONNX Runtime. All of them load lazily and are shared per process.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from .config import EMBED_BACKEND, EMBED_THREADS, ONNX_CACHE_DIR
+from .models import MODEL_NAME, get_model, get_tokenizer
+
+_lock = threading.Lock()
+_backends = {}
+
+
+def _mean_pool(last_hidden_state: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Average token states ignoring padding, then L2-normalise each row."""
+    mask = attention_mask[:, :, None].astype(np.float32)
+    pooled = (last_hidden_state * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return (pooled / np.maximum(norms, 1e-12)).astype(np.float32, copy=False)
+
+
+class TorchBackend:
+    """The PyTorch model at full precision."""
+
+    name = "torch"
+
+    def __init__(self, model_name: str = MODEL_NAME, threads: int = EMBED_THREADS):
+        import torch
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model_name = model_name
+        _, model = get_model(model_name)
+        self.model = self._prepare(model)
+        self.dim = model.config.hidden_size
+
+    @property
+    def cache_key(self) -> str:
+        # Used as the model column of the embedding cache, so vectors from
+        # backends that don't match fp32 exactly are kept apart.
+        return self.model_name
+
+    def _prepare(self, model):
+        return model
+
+    def embed(self, inputs: dict) -> np.ndarray:
+        import torch
+
+        with torch.inference_mode():
+            outputs = self.model(**{key: torch.from_numpy(value) for key, value in inputs.items()})
+            return _mean_pool(outputs.last_hidden_state.numpy(), inputs["attention_mask"])
+
+
+class Int8Backend(TorchBackend):
+    """The PyTorch model with Linear layers dynamically quantized to int8."""
+
+    name = "int8"
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.model_name}#int8"
+
+    def _prepare(self, model):
+        import torch
+
+        # Weights are quantized once; activations are quantized per batch.
+        # The shared fp32 model is copied, not modified.
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend:
+    """The model exported to ONNX and run with ONNX Runtime.
+
+    The export happens once per model and is reused from ONNX_CACHE_DIR.
+    Needs the optional onnx and onnxruntime packages.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str = MODEL_NAME, threads: int = EMBED_THREADS):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("The onnx backend needs onnxruntime: pip install onnx onnxruntime")
+
+        self.model_name = model_name
+        self.cache_key = model_name
+        path = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--"), "model.onnx")
+        if not os.path.exists(path):
+            export_onnx(model_name, path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # 0 lets ONNX Runtime use one thread per physical core.
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.dim = self.session.get_outputs()[0].shape[-1]
+
+    def embed(self, inputs: dict) -> np.ndarray:
+        feed = {name: inputs[name].astype(np.int64, copy=False) for name in self.input_names}
+        (last_hidden_state,) = self.session.run(["last_hidden_state"], feed)
+        return _mean_pool(last_hidden_state, inputs["attention_mask"])
+
+
+def export_onnx(model_name: str, path: str):
+    """Export model_name to an ONNX file at path with dynamic batch and sequence axes."""
+    import torch
+
+    tokenizer, model = get_model(model_name)
+    sample = tokenizer(["passage: export"], return_tensors="pt")
+    names = list(sample.keys())
+
+    class _Wrapper(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *tensors):
+            return self.model(**dict(zip(names, tensors))).last_hidden_state
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with torch.inference_mode():
+        torch.onnx.export(
+            # In eval mode: export puts each module back in its mode afterwards,
+            # and a wrapper left in training mode would switch dropout on in the
+            # shared model the torch backend uses.
+            _Wrapper().eval(), tuple(sample[name] for name in names), tmp_path,
+            input_names=names, output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]},
+            opset_version=17, dynamo=False,
+        )
+    os.replace(tmp_path, path)
+    print(f"✅ Exported {model_name} to {path}.")
+
+
+BACKENDS = {backend.name: backend for backend in (TorchBackend, Int8Backend, OnnxBackend)}
+
+
+def get_backend(name: str = EMBED_BACKEND, model_name: str = MODEL_NAME):
+    """Return the shared backend called name for model_name, building it on first use."""
+    key = (name, model_name)
+    backend = _backends.get(key)
+    if backend is not None:
+        return backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {name!r}; choose from {', '.join(BACKENDS)}.")
+    get_tokenizer(model_name)
+    with _lock:
+        if key not in _backends:
+            _backends[key] = BACKENDS[name](model_name)
+        return _backends[key]
+
+
+def warm_up(name: str = EMBED_BACKEND, background: bool = False):
+    """Build a backend now, or in a daemon thread when background is True."""
+    if not background:
+        return get_backend(name)
+    thread = threading.Thread(target=get_backend, args=(name,), name="d2v-backend-warmup", daemon=True)
+    thread.start()
+    return thread
+
@@ -0,0 +1,141 @@
+# core/chunker.py
+
+import re
+
+import numpy as np
+
+from .config import CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS
+from .models import MODEL_NAME, get_tokenizer
+
+# Sentence ends (including CJK punctuation) followed by whitespace, or blank lines.
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+|\n[ \t]*\n")
+# Numbered ("2.1 Scope") or ALL-CAPS lines without trailing sentence punctuation.
+_HEADING = re.compile(r"^[ \t]*((?:\d+(?:\.\d+)*\.?[ \t]+[^\n]{1,80}|[A-Z][A-Z0-9 ,:&/()'-]{2,80})(?<![.!?]))[ \t]*$", re.M)
+_NON_SPACE = re.compile(r"\S")
+
+
+class Chunk:
+    """A chunk of document text with the pages and character range it came from."""
+
+    __slots__ = ("text", "page_start", "page_end", "char_start", "char_end")
+
+    def __init__(self, text, page_start, page_end, char_start, char_end):
+        self.text = text
+        self.page_start = page_start
+        self.page_end = page_end
+        self.char_start = char_start
+        self.char_end = char_end
+
+    def location(self) -> dict:
+        """Payload fields locating the chunk in its document."""
+        return {"page_start": self.page_start, "page_end": self.page_end,
+                "char_start": self.char_start, "char_end": self.char_end}
+
+    def __repr__(self):
+        return f"Chunk(pages={self.page_start}-{self.page_end}, chars={self.char_start}-{self.char_end}, {self.text[:40]!r})"
+
+
+def _join_pages(pages):
+    """Concatenate (page_number, text) pairs in one pass, recording where each page starts."""
+    numbers, starts, parts = [], [], []
+    offset = 0
+    for number, text in pages:
+        numbers.append(number)
+        starts.append(offset)
+        parts.append(text)
+        parts.append("\n")
+        offset += len(text) + 1
+    return "".join(parts), np.array(numbers, dtype=np.int64), np.array(starts, dtype=np.int64)
+
+
+def _segments(text):
+    """Split text into stripped (start, end, is_heading) spans at sentence ends and heading lines."""
+    headings = [(m.start(1), m.end(1)) for m in _HEADING.finditer(text)]
+    cuts = [0, len(text)]
+    cuts.extend(m.end() for m in _SENTENCE_END.finditer(text))
+    for start, end in headings:
+        cuts.append(start)
+        cuts.append(end)
+    cuts = np.unique(np.array(cuts, dtype=np.int64))
+
+    heading_starts = {start for start, _ in headings}
+    segments = []
+    for start, end in zip(cuts[:-1].tolist(), cuts[1:].tolist()):
+        match = _NON_SPACE.search(text, start, end)
+        if match is None:
+            continue
+        start = match.start()
+        end = start + len(text[start:end].rstrip())
+        segments.append((start, end, start in heading_starts))
+    return segments
+
+
+def chunk_pages(pages, max_tokens: int = CHUNK_MAX_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+                tokenizer=None, prefix: str = "passage: ") -> list:
+    """Pack the text of (page_number, text) pairs into chunks that fit the model.
+
+    Chunks break at sentence ends and start fresh at headings. Sizes are
+    measured in model tokens (including the E5 prefix and special tokens), so
+    no text is lost to truncation at embedding time. Consecutive chunks share
+    up to overlap_tokens worth of trailing sentences.
+    """
+    tokenizer = tokenizer or get_tokenizer(MODEL_NAME)
+    text, page_numbers, page_starts = _join_pages(pages)
+    segments = _segments(text)
+    if not segments:
+        return []
+
+    budget = min(max_tokens, tokenizer.model_max_length)
+    budget -= tokenizer.num_special_tokens_to_add()
+    if "intfloat" in MODEL_NAME:
+        budget -= len(tokenizer(prefix, add_special_tokens=False)["input_ids"])
+    # Token counts of neighbouring sentences don't add up exactly once joined,
+    # so keep a little headroom.
+    budget = max(1, int(budget * 0.97))
+
+    encoded = tokenizer(
+        [text[start:end] for start, end, _ in segments],
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+    )
+
+    # Sentences longer than the budget are cut at token boundaries.
+    pieces = []
+    for (start, end, heading), offsets in zip(segments, encoded["offset_mapping"]):
+        if len(offsets) <= budget:
+            pieces.append((start, end, len(offsets), heading))
+            continue
+        for first in range(0, len(offsets), budget):
+            window = offsets[first:first + budget]
+            pieces.append((start + window[0][0], start + window[-1][1], len(window), False))
+
+    spans = []
+    current, current_tokens, has_body = [], 0, False
+    for piece in pieces:
+        start, end, tokens, heading = piece
+        if current and ((heading and has_body) or current_tokens + tokens > budget):
+            spans.append((current[0][0], current[-1][1]))
+            carried = []
+            if not heading:
+                carried_tokens = 0
+                for previous in reversed(current):
+                    if carried_tokens + previous[2] > overlap_tokens or carried_tokens + previous[2] + tokens > budget:
+                        break
+                    carried.insert(0, previous)
+                    carried_tokens += previous[2]
+            current = carried
+            current_tokens = sum(p[2] for p in carried)
+            has_body = any(not p[3] for p in carried)
+        current.append(piece)
+        current_tokens += tokens
+        has_body = has_body or not heading
+    if current:
+        spans.append((current[0][0], current[-1][1]))
+
+    bounds = np.array(spans, dtype=np.int64)
+    first_pages = page_numbers[np.searchsorted(page_starts, bounds[:, 0], side="right") - 1]
+    last_pages = page_numbers[np.searchsorted(page_starts, bounds[:, 1] - 1, side="right") - 1]
+    return [
+        Chunk(text[start:end], int(first), int(last), start, end)
+        for (start, end), first, last in zip(spans, first_pages.tolist(), last_pages.tolist())
+    ]
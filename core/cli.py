@@ -0,0 +1,444 @@
+# core/cli.py
+
+"""Headless entry point: `d2v ingest`, `d2v watch`, `d2v jobs`, `d2v export`,
+`d2v import`, `d2v search`, `d2v index`, `d2v serve` and `d2v warm`.
+
+Nothing here imports PyQt, so it runs on servers without a display.
+"""
+
+import argparse
+import collections
+import contextlib
+import json
+import os
+import sys
+import time
+
+from .config import (
+    COLLECTION_NAME, EMBED_BACKEND, EMBED_BATCH_SIZE, PARSE_WORKERS, SEARCH_INDEX_PATH,
+    SERVER_BATCH_WINDOW_MS, SERVER_HOST, SERVER_MAX_BATCH, SERVER_PORT,
+)
+
+
+class _Reporter:
+    """Prints progress as emoji lines for people or JSON lines for schedulers."""
+
+    def __init__(self, as_json: bool):
+        self.as_json = as_json
+        self.stream = sys.stdout
+
+    def emit(self, event: str, message: str, **fields):
+        if self.as_json:
+            print(json.dumps({"event": event, "time": round(time.time(), 3), **fields}), file=self.stream, flush=True)
+        else:
+            print(message, file=self.stream, flush=True)
+
+    def quiet(self):
+        # Library code prints status lines; keep them off stdout when stdout
+        # carries JSON.
+        return contextlib.redirect_stdout(sys.stderr) if self.as_json else contextlib.nullcontext()
+
+
+class _ParseProgress:
+    """Stands in for the QProgressBar that parse_multiple_pdfs reports to."""
+
+    def __init__(self, reporter: _Reporter, files: int):
+        self.reporter = reporter
+        self.files = files
+        self.last = -1
+
+    def setValue(self, percent: int):
+        if percent != self.last:
+            self.last = percent
+            self.reporter.emit("progress", f"📄 Parsing {self.files} file(s): {percent}%",
+                               stage="parse", percent=percent, files=self.files)
+
+
+def find_pdfs(paths, recursive: bool = True) -> list:
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(os.path.abspath(path))
+            continue
+        for root, dirs, files in os.walk(path):
+            found.extend(os.path.abspath(os.path.join(root, name)) for name in files if name.lower().endswith(".pdf"))
+            if not recursive:
+                dirs.clear()
+    return sorted(found)
+
+
+def source_names(paths, pdfs) -> dict:
+    """Name each PDF by its path relative to the directory it was found in.
+
+    Files given directly keep their file name; names that still clash (the
+    same relative path under two directories) become absolute paths.
+    """
+    roots = [os.path.abspath(path) for path in paths if os.path.isdir(path)]
+    names = {}
+    for pdf in pdfs:
+        root = max((root for root in roots if pdf.startswith(root + os.sep)), key=len, default=None)
+        names[pdf] = os.path.relpath(pdf, root).replace(os.sep, "/") if root else os.path.basename(pdf)
+    counts = collections.Counter(names.values())
+    return {pdf: pdf if counts[name] > 1 else name for pdf, name in names.items()}
+
+
+def _changed_files(manifest, names, collection, tracked):
+    changed = []
+    for path, source in names.items():
+        stat = os.stat(path)
+        if (manifest.file_signature(path, collection) != (stat.st_size, stat.st_mtime_ns)
+                or tracked.get(path, source) != source):
+            changed.append((path, stat.st_size, stat.st_mtime_ns, source))
+    return changed
+
+
+def ingest(paths, workers: int = PARSE_WORKERS, batch_size: int = EMBED_BATCH_SIZE,
+           collection: str = COLLECTION_NAME, recursive: bool = True, prune: bool = False,
+           reporter: _Reporter = None, manifest=None, client=None, journal=None, stream: bool = False) -> dict:
+    """Ingest new or changed PDFs under paths; with prune, drop files that disappeared.
+
+    Each run is a job in the journal (core.jobs). Jobs of the collection
+    that were interrupted are resumed first, without parsing, embedding or
+    sending again what they had finished. With stream, the changed files
+    go through core.pipeline instead, one file at a time with memory bounded
+    by the batch sizes; each file is recorded as soon as it is sent.
+    """
+    from .jobs import FILES_PER_ROUND, default_journal, run_job
+    from .manifest import Manifest, sync_documents
+    from .parse_cache import default_parse_cache
+    from .pipeline import ingest_pdfs
+
+    reporter = reporter or _Reporter(False)
+    manifest = manifest or Manifest()
+    journal = journal or default_journal()
+    started = time.perf_counter()
+    totals = {"files": 0, "chunks": 0, "upserted": 0, "deleted": 0, "unchanged": 0,
+              "duplicates": 0, "bytes_saved": 0, "failed": 0}
+
+    def add(result):
+        for key in ("upserted", "deleted", "unchanged", "duplicates", "bytes_saved"):
+            totals[key] += result[key]
+
+    def on_progress(**fields):
+        def report(done, total, chunks):
+            chunks += totals["chunks"]
+            elapsed = time.perf_counter() - started
+            reporter.emit("progress", f"🧠 {done}/{total} file(s) ingested.",
+                          stage="ingest", files_done=done, files_total=total,
+                          chunks=chunks, chunks_per_sec=round(chunks / elapsed, 2), **fields)
+        return report
+
+    def run(job_id, files):
+        result = run_job(job_id, journal, client=client, manifest=manifest, workers=workers, batch_size=batch_size,
+                         parse_progress=_ParseProgress(reporter, min(files, FILES_PER_ROUND)),
+                         on_round=on_progress(job_id=job_id))
+        add(result)
+        totals["files"] += result["files"]
+        totals["chunks"] += result["chunks"]
+        totals["failed"] += result["failed"]
+
+    with reporter.quiet():
+        for job in reversed(journal.jobs(collection, unfinished=True)):
+            reporter.emit("resume", f"⏯️ Resuming job {job['job_id']} "
+                          f"({job['files_done']}/{job['files']} file(s) done).", **job)
+            try:
+                run(job["job_id"], job["files"])
+            except Exception as e:
+                # The job stays interrupted for the next run; new files go ahead.
+                reporter.emit("error", f"❌ Job {job['job_id']} failed again: {e}",
+                              job_id=job["job_id"], error=str(e))
+
+        pdfs = find_pdfs(paths, recursive)
+        names = source_names(paths, pdfs)
+        tracked = manifest.tracked_files(collection)
+        changed = _changed_files(manifest, names, collection, tracked)
+        reporter.emit("scan", f"🔎 {len(pdfs)} PDF(s) found, {len(changed)} new or changed.",
+                      found=len(pdfs), changed=len(changed))
+        if changed and stream:
+            result = ingest_pdfs([path for path, *_ in changed], embed_batch_size=batch_size, client=client,
+                                 manifest=manifest, collection=collection,
+                                 sources=[source for *_, source in changed], progress=on_progress())
+            add(result)
+            totals["files"] += result["files"]
+            totals["chunks"] += result["chunks"]
+        elif changed:
+            run(journal.create(changed, collection), len(changed))
+
+        # Points of files that were ingested under another name (older
+        # versions used bare file names, which clash across folders).
+        renamed = {tracked[path] for path, *_ in changed if tracked.get(path, names[path]) != names[path]}
+        for source in sorted(renamed - set(names.values())):
+            add(sync_documents({source: []}, client=client, manifest=manifest, collection=collection))
+
+        if prune:
+            present = set(pdfs)
+            roots = [os.path.abspath(p) for p in paths]
+            for path, source in manifest.tracked_files(collection).items():
+                if path not in present and any(path == root or path.startswith(root + os.sep) for root in roots):
+                    add(sync_documents({source: []}, client=client, manifest=manifest, collection=collection))
+                    manifest.forget_file(path, collection)
+
+    elapsed = time.perf_counter() - started
+    totals["seconds"] = round(elapsed, 3)
+    totals["chunks_per_sec"] = round(totals["chunks"] / elapsed, 2) if elapsed else 0.0
+    parse_cache = default_parse_cache()
+    if parse_cache is not None:
+        totals["parse_cache"] = parse_cache.stats()
+    reporter.emit("summary", f"✅ {totals['files']} file(s), {totals['chunks']} chunks: "
+                  f"{totals['upserted']} upserted, {totals['deleted']} deleted, "
+                  f"{totals['duplicates']} duplicates skipped in {elapsed:.1f}s"
+                  + (f"; {totals['failed']} file(s) could not be parsed." if totals["failed"] else "."), **totals)
+    return totals
+
+
+def export(paths, out: str, workers: int = PARSE_WORKERS, batch_size: int = EMBED_BATCH_SIZE,
+           recursive: bool = True, reporter: _Reporter = None) -> int:
+    """Parse and embed PDFs under paths into an export directory, without Qdrant."""
+    from .embedding import generate_embeddings_for_chunks
+    from .export import EmbeddingWriter
+    from .jobs import FILES_PER_ROUND
+    from .parser import parse_multiple_pdfs
+
+    reporter = reporter or _Reporter(False)
+    pdfs = find_pdfs(paths, recursive)
+    names = source_names(paths, pdfs)
+    with reporter.quiet(), EmbeddingWriter(out) as writer:
+        for start in range(0, len(pdfs), FILES_PER_ROUND):
+            round_files = pdfs[start:start + FILES_PER_ROUND]
+            chunks_map = parse_multiple_pdfs(round_files, _ParseProgress(reporter, len(round_files)), workers=workers,
+                                             with_metadata=True, sources=[names[path] for path in round_files])
+            for source, chunks in chunks_map.items():
+                writer.write(generate_embeddings_for_chunks(chunks, batch_size, sources=[source] * len(chunks)))
+            done = start + len(round_files)
+            reporter.emit("progress", f"🧠 {done}/{len(pdfs)} file(s) exported.",
+                          stage="export", files_done=done, files_total=len(pdfs), rows=len(writer))
+    reporter.emit("summary", f"✅ Exported {len(writer)} embeddings from {len(pdfs)} file(s) to {out}.",
+                  files=len(pdfs), rows=len(writer), path=out)
+    return len(writer)
+
+
+def warm_cache(collection: str, backend, client=None, cache=None, sample: int = 256) -> float:
+    """Copy a collection's vectors into the embedding cache and return the hit rate of a sample.
+
+    The entries are stored under backend.cache_key, which is what embedding
+    looks them up by. The sample is the collection's first texts, embedded
+    through the cache as an ingest would.
+    """
+    from .embedding import embed_texts
+    from .embedding_cache import default_cache
+    from .uploader import get_qdrant_client
+
+    cache = cache or default_cache()
+    if cache is None:
+        raise ValueError("EMBED_CACHE_PATH is empty, so there is no embedding cache to warm.")
+    client = client or get_qdrant_client()
+    start = time.perf_counter()
+    warmed = cache.warm_from_qdrant(client, collection, backend.cache_key)
+    points, _ = client.scroll(collection, limit=sample, with_payload=["text"])
+    texts = [point.payload["text"] for point in points if point.payload and "text" in point.payload]
+    hits = cache.hits
+    embed_texts(texts, cache=cache, backend=backend)
+    hit_rate = (cache.hits - hits) / len(texts) if texts else 1.0
+    print(f"🔥 Cached {warmed} vector(s) from '{collection}' in {time.perf_counter() - start:.1f}s; "
+          f"{hit_rate:.0%} of a {len(texts)}-text sample hit the cache.")
+    return hit_rate
+
+
+def watch(paths, interval: float, **kwargs):
+    """Re-scan paths every interval seconds and ingest whatever changed."""
+    reporter = kwargs.get("reporter") or _Reporter(False)
+    reporter.emit("watch", f"👀 Watching {', '.join(paths)} every {interval:g}s.", paths=list(paths), interval=interval)
+    while True:
+        try:
+            ingest(paths, **kwargs)
+        except Exception as e:
+            reporter.emit("error", f"❌ Ingest failed: {e}", error=str(e))
+        time.sleep(interval)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="d2v", description="Ingest PDFs into Qdrant without the GUI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_ingest_args(p):
+        p.add_argument("paths", nargs="+", help="PDF files or directories")
+        p.add_argument("--workers", type=int, default=PARSE_WORKERS, help="parser processes")
+        p.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="embedding batch size")
+        p.add_argument("--collection", default=COLLECTION_NAME)
+        p.add_argument("--no-recursive", dest="recursive", action="store_false")
+        p.add_argument("--prune", action="store_true", help="delete points of PDFs that were removed")
+        p.add_argument("--stream", action="store_true",
+                       help="stream one file at a time through the bounded-memory pipeline (no job journal)")
+        p.add_argument("--json", action="store_true", help="print JSON lines instead of text")
+
+    ingest_parser = sub.add_parser("ingest", help="ingest new or changed PDFs once")
+    add_ingest_args(ingest_parser)
+    ingest_parser.add_argument("--profile", metavar="FILE", help="write cProfile stats to FILE and report stage timings")
+    watch_parser = sub.add_parser("watch", help="keep ingesting new or changed PDFs")
+    add_ingest_args(watch_parser)
+    watch_parser.add_argument("--interval", type=float, default=30.0, help="seconds between scans")
+
+    jobs_parser = sub.add_parser("jobs", help="list ingestion jobs (interrupted ones resume on the next ingest)")
+    jobs_parser.add_argument("--collection", default=COLLECTION_NAME)
+    jobs_parser.add_argument("--all", action="store_true", help="include finished jobs")
+    jobs_parser.add_argument("--json", action="store_true", help="print JSON lines instead of text")
+
+    export_parser = sub.add_parser("export", help="embed PDFs into an export directory instead of Qdrant")
+    export_parser.add_argument("paths", nargs="+", help="PDF files or directories")
+    export_parser.add_argument("--out", required=True, help="export directory to write")
+    export_parser.add_argument("--workers", type=int, default=PARSE_WORKERS, help="parser processes")
+    export_parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="embedding batch size")
+    export_parser.add_argument("--no-recursive", dest="recursive", action="store_false")
+    export_parser.add_argument("--json", action="store_true", help="print JSON lines instead of text")
+
+    import_parser = sub.add_parser("import", help="bulk-upload an export directory to Qdrant")
+    import_parser.add_argument("path", help="export directory")
+    import_parser.add_argument("--collection", default=COLLECTION_NAME)
+
+    search_parser = sub.add_parser("search", help="show the chunks closest to a query")
+    search_parser.add_argument("query")
+    search_parser.add_argument("-k", type=int, default=5, help="number of results")
+    search_parser.add_argument("--collection", default=COLLECTION_NAME)
+    search_parser.add_argument("--local", action="store_true", help="search the local index instead of Qdrant")
+    search_parser.add_argument("--index", default=SEARCH_INDEX_PATH, help="local index directory")
+    search_parser.add_argument("--source", help="only search chunks of this file (Qdrant only)")
+    search_parser.add_argument("--page", type=int, help="only search chunks covering this page (Qdrant only)")
+    search_parser.add_argument("--json", action="store_true", help="print JSON lines instead of text")
+
+    index_parser = sub.add_parser("index", help="build the local search index from a collection")
+    index_parser.add_argument("--collection", default=COLLECTION_NAME)
+    index_parser.add_argument("--index", default=SEARCH_INDEX_PATH, help="local index directory")
+
+    serve_parser = sub.add_parser("serve", help="serve embeddings over HTTP on localhost")
+    serve_parser.add_argument("--host", default=SERVER_HOST)
+    serve_parser.add_argument("--port", type=int, default=SERVER_PORT)
+    serve_parser.add_argument("--window-ms", type=float, default=SERVER_BATCH_WINDOW_MS, help="micro-batching window")
+    serve_parser.add_argument("--max-batch", type=int, default=SERVER_MAX_BATCH)
+
+    collection_parser = sub.add_parser("collection", help="show (or create) the Qdrant collection")
+    collection_parser.add_argument("--collection", default=COLLECTION_NAME)
+    collection_parser.add_argument("--create", action="store_true",
+                                   help="create it with the configured settings if it doesn't exist")
+    collection_parser.add_argument("--json", action="store_true", help="print JSON lines instead of text")
+
+    warm_parser = sub.add_parser("warm", help="download and load the embedding model")
+    warm_parser.add_argument("--backend", default=EMBED_BACKEND, help="torch, int8 or onnx")
+    warm_parser.add_argument("--from-collection", metavar="NAME",
+                             help="also fill the embedding cache with the vectors stored in collection NAME")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "warm":
+        from .backends import warm_up
+
+        start = time.perf_counter()
+        backend = warm_up(args.backend)
+        print(f"✅ Loaded {backend.model_name} ({backend.name}) in {time.perf_counter() - start:.1f}s.")
+        if args.from_collection and warm_cache(args.from_collection, backend) < 1.0:
+            print("⚠️ Some cached vectors were not found again; EMBED_CACHE_MAX_MB may be too small for the collection.")
+            return 1
+        return 0
+
+    if args.command == "export":
+        export(args.paths, args.out, workers=args.workers, batch_size=args.batch_size,
+               recursive=args.recursive, reporter=_Reporter(args.json))
+        return 0
+
+    if args.command == "jobs":
+        from .jobs import default_journal
+
+        reporter = _Reporter(args.json)
+        jobs = default_journal().jobs(args.collection, unfinished=not args.all)
+        for job in jobs:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(job["updated"]))
+            error = f" ({job['error']})" if job["error"] else ""
+            reporter.emit("job", f"{job['job_id']}  {job['status']:<11} {job['files_done']}/{job['files']} file(s)  "
+                          f"{when}{error}", **job)
+        if not jobs:
+            reporter.emit("summary", "✅ No jobs to show.", jobs=0)
+        return 0
+
+    if args.command == "import":
+        from .export import import_embeddings
+
+        import_embeddings(args.path, collection_name=args.collection)
+        return 0
+
+    if args.command == "serve":
+        from .server import serve
+
+        serve(args.host, args.port, window_ms=args.window_ms, max_batch=args.max_batch)
+        return 0
+
+    if args.command == "collection":
+        from .collection import describe, ensure_collection
+        from .uploader import get_qdrant_client
+
+        reporter = _Reporter(args.json)
+        client = get_qdrant_client()
+        if args.create:
+            from .backends import get_backend
+
+            ensure_collection(client, get_backend(EMBED_BACKEND).dim, args.collection)
+        elif not client.collection_exists(args.collection):
+            reporter.emit("error", f"⚠️ Collection '{args.collection}' does not exist (use --create).",
+                          collection=args.collection)
+            return 1
+        info = describe(client, args.collection)
+        reporter.emit("collection", "\n".join(f"{key}: {value}" for key, value in info.items()), **info)
+        return 0
+
+    if args.command == "index":
+        from .search import LocalIndex
+
+        LocalIndex.from_qdrant(collection_name=args.collection).save(args.index)
+        return 0
+
+    if args.command == "search":
+        from .search import LocalIndex, search
+
+        reporter = _Reporter(args.json)
+        with reporter.quiet():
+            index = LocalIndex.load(args.index) if args.local else None
+            start = time.perf_counter()
+            hits = search(args.query, args.k, index=index, collection_name=args.collection,
+                          source=args.source, page=args.page)
+            elapsed = time.perf_counter() - start
+        for rank, hit in enumerate(hits, 1):
+            where = f"{hit['source'] or ''}" + (f" p.{hit['page']}" if hit["page"] is not None else "")
+            reporter.emit("hit", f"{rank}. [{hit['score']:.3f}] {where}\n   {hit['text'][:300]}",
+                          rank=rank, **hit)
+        reporter.emit("summary", f"🔎 {len(hits)} result(s) in {elapsed * 1000:.0f} ms.",
+                      results=len(hits), ms=round(elapsed * 1000, 2))
+        return 0
+
+    options = dict(
+        workers=args.workers,
+        batch_size=args.batch_size,
+        collection=args.collection,
+        recursive=args.recursive,
+        prune=args.prune,
+        stream=args.stream,
+        reporter=_Reporter(args.json),
+    )
+    if args.command == "watch":
+        watch(args.paths, args.interval, **options)
+    elif args.profile:
+        from . import profiling
+
+        profiling.enable()
+        with options["reporter"].quiet(), profiling.profile(args.profile):
+            ingest(args.paths, **options)
+        options["reporter"].emit("profile", "⏱️ " + ", ".join(
+            f"{name} {stats['total_ms'] / 1000:.2f}s" for name, stats in profiling.summary().items()
+        ), spans=profiling.summary())
+    else:
+        ingest(args.paths, **options)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+# core/clustering.py
+
+"""Spherical k-means over normalised embeddings, shared by the IVF search
+index (core.search) and k-means summaries (core.summarizer).
+"""
+
+import numpy as np
+
+
+def kmeans(vectors: np.ndarray, lists: int, iterations: int = 10, sample: int = 64, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of vectors; returns normalised centroids."""
+    rng = np.random.default_rng(seed)
+    count = min(len(vectors), lists * sample)
+    train = np.ascontiguousarray(vectors[np.sort(rng.choice(len(vectors), count, replace=False))])
+    centroids = train[rng.choice(count, lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(train @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        used, starts = np.unique(assignment[order], return_index=True)
+        centroids[used] = np.add.reduceat(train[order], starts, axis=0)
+        empty = np.setdiff1d(np.arange(lists), used)
+        # Lists that lost all their points restart from random samples.
+        centroids[empty] = train[rng.choice(count, len(empty), replace=False)]
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray, block: int = 16384) -> np.ndarray:
+    """Index of the nearest centroid of each row, computed block rows at a time."""
+    return np.concatenate([
+        np.argmax(vectors[start:start + block] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), block)
+    ])
@@ -0,0 +1,157 @@
+# core/collection.py
+
+"""Creating and describing the Qdrant collection the chunks go into.
+
+Collections are created once with the HNSW, optimizer, storage and
+quantization settings from core.config, and are never recreated: an
+existing collection is checked against the model's vector size and only
+gets the payload indexes it is missing. Points carry
+
+    text, source, sources (deduplicated chunks), page_start, page_end,
+    char_start, char_end, ingested_at
+
+and the fields used in filters are indexed, so filtered searches stay
+fast on large collections.
+"""
+
+import warnings
+import weakref
+
+from .config import (
+    COLLECTION_NAME, QDRANT_VECTOR_NAME, QDRANT_ON_DISK, QDRANT_ON_DISK_PAYLOAD, QDRANT_QUANTIZATION,
+    QDRANT_HNSW_M, QDRANT_HNSW_EF_CONSTRUCT, QDRANT_INDEXING_THRESHOLD, QDRANT_SEGMENTS,
+)
+
+# Payload fields that get an index, with their Qdrant schema type.
+PAYLOAD_INDEXES = {
+    "source": "keyword",
+    "sources": "keyword",
+    "page_start": "integer",
+    "page_end": "integer",
+    "ingested_at": "datetime",
+}
+
+# Collections already checked, per client; weak keys so a new client that
+# happens to reuse a dead one's id() is checked again.
+_ensured = weakref.WeakKeyDictionary()
+
+
+def vectors_config(vector_size: int):
+    from qdrant_client.models import Distance, VectorParams
+
+    params = VectorParams(size=vector_size, distance=Distance.COSINE, on_disk=QDRANT_ON_DISK)
+    return {QDRANT_VECTOR_NAME: params} if QDRANT_VECTOR_NAME else params
+
+
+def _quantization_config():
+    from qdrant_client.models import ScalarQuantization, ScalarQuantizationConfig, ScalarType
+
+    if not QDRANT_QUANTIZATION:
+        return None
+    if QDRANT_QUANTIZATION != "int8":
+        raise ValueError(f"Unsupported QDRANT_QUANTIZATION {QDRANT_QUANTIZATION!r}; use 'int8' or leave it empty.")
+    # The quantized copy stays in RAM for search; originals can live on disk
+    # and are only read to rescore the top candidates.
+    return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+
+
+def create_collection(client, vector_size: int, collection_name: str = COLLECTION_NAME):
+    """Create collection_name with the configured index and storage settings."""
+    from qdrant_client.models import HnswConfigDiff, OptimizersConfigDiff
+
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=vectors_config(vector_size),
+        hnsw_config=HnswConfigDiff(m=QDRANT_HNSW_M, ef_construct=QDRANT_HNSW_EF_CONSTRUCT),
+        optimizers_config=OptimizersConfigDiff(
+            indexing_threshold=QDRANT_INDEXING_THRESHOLD,
+            default_segment_number=QDRANT_SEGMENTS or None,
+        ),
+        quantization_config=_quantization_config(),
+        on_disk_payload=QDRANT_ON_DISK_PAYLOAD,
+    )
+    print(f"✅ Collection '{collection_name}' created ({vector_size}-dim vectors).")
+
+
+def collection_vector_size(client, collection_name: str = COLLECTION_NAME) -> int:
+    """Vector size of an existing collection, for the configured vector name."""
+    vectors = client.get_collection(collection_name).config.params.vectors
+    if isinstance(vectors, dict):
+        if QDRANT_VECTOR_NAME not in vectors:
+            raise ValueError(f"Collection '{collection_name}' has no vector named {QDRANT_VECTOR_NAME!r} "
+                             f"(it has {', '.join(sorted(vectors)) or 'none'}).")
+        return vectors[QDRANT_VECTOR_NAME].size
+    if QDRANT_VECTOR_NAME:
+        raise ValueError(f"Collection '{collection_name}' uses an unnamed vector; unset QDRANT_VECTOR_NAME.")
+    return vectors.size
+
+
+def ensure_payload_indexes(client, collection_name: str = COLLECTION_NAME):
+    """Create the PAYLOAD_INDEXES the collection doesn't have yet."""
+    existing = client.get_collection(collection_name).payload_schema or {}
+    with warnings.catch_warnings():
+        # Local (in-process) Qdrant has no payload indexes and warns about each one.
+        warnings.simplefilter("ignore", UserWarning)
+        for field, schema in PAYLOAD_INDEXES.items():
+            if field not in existing:
+                client.create_payload_index(collection_name=collection_name, field_name=field,
+                                            field_schema=schema, wait=True)
+
+
+def ensure_collection(client, vector_size: int, collection_name: str = COLLECTION_NAME):
+    """Create the collection if it is missing; never drops existing points.
+
+    Raises ValueError when an existing collection stores vectors of another
+    size, since upserts into it would fail.
+    """
+    if collection_name in _ensured.get(client, ()):
+        return
+    if client.collection_exists(collection_name):
+        existing = collection_vector_size(client, collection_name)
+        if existing != vector_size:
+            raise ValueError(f"Collection '{collection_name}' stores {existing}-dim vectors, "
+                             f"but the model produces {vector_size}-dim ones.")
+    else:
+        create_collection(client, vector_size, collection_name)
+    ensure_payload_indexes(client, collection_name)
+    _ensured.setdefault(client, set()).add(collection_name)
+
+
+def point_vectors(rows: list):
+    """Vectors in the shape upserts expect: plain rows, or {name: rows} for a named vector."""
+    return {QDRANT_VECTOR_NAME: rows} if QDRANT_VECTOR_NAME else rows
+
+
+def payload_filter(source: str = None, page: int = None):
+    """A Qdrant filter for points of source and/or covering page, or None for no filter."""
+    from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue, Range
+
+    conditions = []
+    if source:
+        # Deduplicated chunks list every file they occur in under "sources".
+        conditions.append(Filter(should=[
+            FieldCondition(key="source", match=MatchValue(value=source)),
+            FieldCondition(key="sources", match=MatchAny(any=[source])),
+        ]))
+    if page is not None:
+        conditions.append(FieldCondition(key="page_start", range=Range(lte=page)))
+        conditions.append(FieldCondition(key="page_end", range=Range(gte=page)))
+    return Filter(must=conditions) if conditions else None
+
+
+def describe(client, collection_name: str = COLLECTION_NAME) -> dict:
+    """Point counts, status and settings of a collection."""
+    info = client.get_collection(collection_name)
+    params = info.config.params
+    return {
+        "collection": collection_name,
+        "status": str(getattr(info.status, "value", info.status)),
+        "points": info.points_count,
+        "indexed_vectors": info.indexed_vectors_count,
+        "segments": info.segments_count,
+        "vector_size": collection_vector_size(client, collection_name),
+        "vector_name": QDRANT_VECTOR_NAME or None,
+        "on_disk_payload": params.on_disk_payload,
+        "quantization": "int8" if info.config.quantization_config else None,
+        "payload_indexes": sorted(info.payload_schema or {}),
+    }
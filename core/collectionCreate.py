@@ -1,29 +0,0 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-QDRANT_URL = os.getenv("QDRANT_URL")
-QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
-COLLECTION_NAME = os.getenv("COLLECTION_NAME")
-
-client = QdrantClient(
-    url=QDRANT_URL,
-    api_key=QDRANT_API_KEY
-)
-
-
-
-if not client.collection_exists(COLLECTION_NAME):
-    client.create_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(
-            size=768,  
-            distance=Distance.COSINE
-        )
-    )
-    print(f"✅ Collection '{COLLECTION_NAME}' created.")
-else:
-    print(f"ℹ️ Collection '{COLLECTION_NAME}' already exists. No changes made.")
@@ -6,3 +6,84 @@ load_dotenv()
 QDRANT_URL = os.getenv("QDRANT_URL") 
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 COLLECTION_NAME = os.getenv("COLLECTION_NAME") 
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+# torch (fp32), int8 (dynamically quantized torch) or onnx (ONNX Runtime).
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+# Intra-op threads for inference; 0 keeps the library default.
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "d2v", "onnx"))
+# Embedding processes for large jobs; 1 embeds in-process.
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+EMBED_WEIGHTS_DIR = os.getenv("EMBED_WEIGHTS_DIR", os.path.join(os.path.expanduser("~"), ".cache", "d2v", "weights"))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "1"))
+PARSE_PAGES_PER_TASK = int(os.getenv("PARSE_PAGES_PER_TASK", "50"))
+PARSE_CACHE_PATH = os.getenv("PARSE_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "d2v", "pages.sqlite3"))
+PARSE_CACHE_MAX_MB = int(os.getenv("PARSE_CACHE_MAX_MB", "2048"))
+# Files at least this large also cache each page by content hash.
+PARSE_CACHE_PAGE_HASH_MB = int(os.getenv("PARSE_CACHE_PAGE_HASH_MB", "20"))
+# Scanned (image-only) pages are OCRed with Tesseract in their own process
+# pool; 0 workers turns OCR off.
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", "16"))
+OCR_PAGES_PER_TASK = int(os.getenv("OCR_PAGES_PER_TASK", "4"))
+
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "d2v", "embeddings.sqlite3"))
+EMBED_CACHE_MAX_MB = int(os.getenv("EMBED_CACHE_MAX_MB", "1024"))
+MANIFEST_PATH = os.getenv("MANIFEST_PATH", os.path.join(os.path.expanduser("~"), ".d2v", "manifest.sqlite3"))
+JOB_JOURNAL_PATH = os.getenv("JOB_JOURNAL_PATH", os.path.join(os.path.expanduser("~"), ".d2v", "jobs.sqlite3"))
+# Chunks embedded and sent per checkpoint when syncing a job.
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "1024"))
+
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "1").lower() in ("1", "true", "yes")
+# Collection settings, applied when d2v creates a collection (see core.collection).
+QDRANT_VECTOR_NAME = os.getenv("QDRANT_VECTOR_NAME", "")
+QDRANT_ON_DISK = os.getenv("QDRANT_ON_DISK", "0").lower() in ("1", "true", "yes")
+QDRANT_ON_DISK_PAYLOAD = os.getenv("QDRANT_ON_DISK_PAYLOAD", "1").lower() in ("1", "true", "yes")
+# "int8" keeps a scalar-quantized copy of the vectors in RAM; empty disables it.
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "").lower()
+QDRANT_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+QDRANT_INDEXING_THRESHOLD = int(os.getenv("QDRANT_INDEXING_THRESHOLD", "20000"))
+QDRANT_SEGMENTS = int(os.getenv("QDRANT_SEGMENTS", "0"))
+UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "256"))
+UPLOAD_MAX_BATCH_MB = int(os.getenv("UPLOAD_MAX_BATCH_MB", "16"))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
+UPLOAD_RETRIES = int(os.getenv("UPLOAD_RETRIES", "5"))
+
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "512"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "64"))
+
+# Record per-stage timing spans (see core.profiling).
+PROFILE_SPANS = os.getenv("PROFILE_SPANS", "0").lower() in ("1", "true", "yes")
+
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", os.path.join(os.path.expanduser("~"), ".d2v", "index"))
+# Local indexes with at least this many vectors use IVF instead of exact search.
+SEARCH_IVF_THRESHOLD = int(os.getenv("SEARCH_IVF_THRESHOLD", "50000"))
+SEARCH_NPROBE = int(os.getenv("SEARCH_NPROBE", "32"))
+
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8765"))
+# Requests arriving within this window are embedded as one batch.
+SERVER_BATCH_WINDOW_MS = float(os.getenv("SERVER_BATCH_WINDOW_MS", "5"))
+SERVER_MAX_BATCH = int(os.getenv("SERVER_MAX_BATCH", "64"))
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "10000"))
+
+SUMMARY_CHUNKS = int(os.getenv("SUMMARY_CHUNKS", "5"))
+SUMMARY_EXCERPT_CHARS = int(os.getenv("SUMMARY_EXCERPT_CHARS", "300"))
+# Documents with at least this many chunks are summarised by k-means instead of MMR.
+SUMMARY_KMEANS_THRESHOLD = int(os.getenv("SUMMARY_KMEANS_THRESHOLD", "2000"))
+SUMMARY_MMR_DIVERSITY = float(os.getenv("SUMMARY_MMR_DIVERSITY", "0.3"))
+
+# Drop exact and near-duplicate chunks before embedding (see core.dedup).
+DEDUP = os.getenv("DEDUP", "1").lower() in ("1", "true", "yes")
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_SHINGLE_WORDS = int(os.getenv("DEDUP_SHINGLE_WORDS", "5"))
+# Header/footer lines repeated on this share of a document's pages are stripped.
+STRIP_BOILERPLATE = os.getenv("STRIP_BOILERPLATE", "1").lower() in ("1", "true", "yes")
+BOILERPLATE_EDGE_LINES = int(os.getenv("BOILERPLATE_EDGE_LINES", "3"))
+BOILERPLATE_MIN_RATIO = float(os.getenv("BOILERPLATE_MIN_RATIO", "0.5"))
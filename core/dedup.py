@@ -0,0 +1,245 @@
+# core/dedup.py
+
+"""Boilerplate stripping and duplicate chunk detection, run before embedding.
+
+Lines that repeat at the top or bottom of most pages of a document
+(running headers, footers, page numbers) are removed before chunking.
+Chunks are then deduplicated across the files being ingested together:
+exact copies by a hash of their normalised text, near copies by MinHash
+signatures bucketed with LSH and confirmed by estimated Jaccard
+similarity. The first copy is kept as the canonical chunk and remembers
+every source it was seen in. Exact copies of chunks stored by earlier
+runs (found through the manifest by the same hash) reuse those points.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+from .config import (
+    BOILERPLATE_EDGE_LINES, BOILERPLATE_MIN_RATIO, DEDUP_BANDS, DEDUP_NUM_PERM, DEDUP_SHINGLE_WORDS, DEDUP_THRESHOLD,
+)
+from .manifest import point_id
+
+_DIGITS = re.compile(r"\d+")
+_WORD = re.compile(r"\w+")
+_SHINGLE_PRIME = np.uint64(1099511628211)
+
+
+def _line_key(line: str) -> str:
+    # "Page 3 of 40" and "Page 4 of 40" are the same footer.
+    return _DIGITS.sub("#", " ".join(line.lower().split()))
+
+
+def _edge_lines(lines: list, edge: int) -> list:
+    """Indices of the first and last edge non-blank lines, never more than a third of the page from each end."""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    edge = min(edge, len(filled) // 3)
+    return sorted(set(filled[:edge] + filled[len(filled) - edge:]))
+
+
+def strip_boilerplate(pages, edge: int = BOILERPLATE_EDGE_LINES, min_ratio: float = BOILERPLATE_MIN_RATIO) -> list:
+    """Drop header/footer lines that repeat on at least min_ratio of a document's pages."""
+    pages = list(pages)
+    if len(pages) < 3:
+        return pages
+    split = [text.split("\n") for _, text in pages]
+    counts = {}
+    for lines in split:
+        for key in {_line_key(lines[i]) for i in _edge_lines(lines, edge)}:
+            counts[key] = counts.get(key, 0) + 1
+    threshold = max(2, min_ratio * len(pages))
+    repeated = {key for key, count in counts.items() if count >= threshold}
+    if not repeated:
+        return pages
+
+    stripped = []
+    for (number, _), lines in zip(pages, split):
+        drop = {i for i in _edge_lines(lines, edge) if _line_key(lines[i]) in repeated}
+        stripped.append((number, "\n".join(line for i, line in enumerate(lines) if i not in drop)))
+    return stripped
+
+
+def _normalise(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def chunk_key(text: str) -> bytes:
+    """Hash of a chunk's normalised text: equal for exact duplicates."""
+    return hashlib.blake2b(_normalise(text).encode("utf-8"), digest_size=16).digest()
+
+
+class Deduplicator:
+    """Incremental exact + MinHash/LSH duplicate detector.
+
+    add() returns the index of the canonical chunk a text belongs to and
+    whether it is new. Texts are not kept: per canonical chunk only its
+    point id, owning source, hash, signature and LSH bucket entries are,
+    about 2 KB per unique chunk whatever its length.
+
+    use_stored() registers points already in the collection by chunk key;
+    a text matching one is a duplicate of that point (owner None) unless
+    the point is the text's own.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM,
+                 bands: int = DEDUP_BANDS, shingle_words: int = DEDUP_SHINGLE_WORDS, seed: int = 0):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands}).")
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd 64-bit multipliers, keep the high 32 bits.
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_words = shingle_words
+        self.ids = []
+        self.owners = []
+        self.exact = 0
+        self.near = 0
+        self.seen = 0
+        self._hashes = {}
+        self._stored = {}
+        self._signatures = np.empty((256, num_perm), dtype=np.uint32)
+        # All bands share one dict of 64-bit keys (salted per band); a bucket
+        # holding a single chunk stores its bare index instead of a list.
+        self._band_salt = rng.integers(0, 2 ** 63, bands, dtype=np.uint64)
+        self._buckets = {}
+        # Other sources of chunks seen in more than one.
+        self._also = {}
+
+    def signature(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower()) or [""]
+        ids = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words), dtype=np.uint64, count=len(words))
+        width = min(self.shingle_words, len(ids))
+        shingles = np.zeros(len(ids) - width + 1, dtype=np.uint64)
+        for offset in range(width):
+            shingles = shingles * _SHINGLE_PRIME + ids[offset:offset + len(shingles)]
+        hashed = (self._a[:, None] * shingles[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> list:
+        rows = signature.reshape(self.bands, self.rows).astype(np.uint64)
+        keys = self._band_salt.copy()
+        for row in range(self.rows):
+            keys = keys * _SHINGLE_PRIME + rows[:, row]
+        return keys.tolist()
+
+    def use_stored(self, points: dict):
+        """Treat {chunk key: point id} of points stored by earlier runs as canonical chunks."""
+        self._stored.update(points)
+
+    def add(self, text: str, source: str = "", key: bytes = None):
+        """Return (canonical index, is_new) for text, recording source on the canonical chunk."""
+        self.seen += 1
+        key = key or chunk_key(text)
+        index = self._hashes.get(key)
+        if index is not None:
+            self.exact += 1
+            self._add_source(index, source)
+            return index, False
+
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature)
+        own_id = point_id(source, text)
+        stored = self._stored.pop(key, None)
+        if stored is not None and stored != own_id:
+            # Stored under another source: later near copies match it too.
+            self.exact += 1
+            index = self._register(stored, None, key, signature, band_keys)
+            self._add_source(index, source)
+            return index, False
+
+        candidates = set()
+        for bucket_key in band_keys:
+            bucket = self._buckets.get(bucket_key)
+            if isinstance(bucket, list):
+                candidates.update(bucket)
+            elif bucket is not None:
+                candidates.add(bucket)
+        for candidate in sorted(candidates):
+            if np.mean(self._signatures[candidate] == signature) >= self.threshold:
+                self.near += 1
+                self._hashes[key] = candidate
+                self._add_source(candidate, source)
+                return candidate, False
+
+        return self._register(own_id, source, key, signature, band_keys), True
+
+    def _register(self, pid: str, owner, key: bytes, signature: np.ndarray, band_keys: list) -> int:
+        index = len(self.ids)
+        self.ids.append(pid)
+        self.owners.append(owner)
+        self._hashes[key] = index
+        if index == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[index] = signature
+        for bucket_key in band_keys:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                self._buckets[bucket_key] = index
+            elif isinstance(bucket, list):
+                bucket.append(index)
+            else:
+                self._buckets[bucket_key] = [bucket, index]
+        return index
+
+    def _add_source(self, index: int, source: str):
+        if source != self.owners[index] and source not in self._also.get(index, ()):
+            self._also.setdefault(index, []).append(source)
+
+    def sources(self, index: int) -> list:
+        """Every source canonical chunk index was seen in, its owner first (if it was seen in this run)."""
+        owner = self.owners[index]
+        return [*([owner] if owner is not None else []), *self._also.get(index, ())]
+
+    def shared(self):
+        """(point id, sources) of each canonical chunk seen in more than one source."""
+        for index in sorted(self._also):
+            yield self.ids[index], self.sources(index)
+
+    def stats(self, dropped_text: int = 0) -> dict:
+        return {
+            "chunks": self.seen, "unique": self.seen - self.exact - self.near, "exact": self.exact, "near": self.near,
+            "saved": self.exact + self.near, "text_bytes_saved": dropped_text,
+        }
+
+
+def dedup_chunks(chunks_map: dict, deduplicator: Deduplicator = None, stored=None):
+    """Drop duplicate chunks from {source: [texts or Chunk objects]}.
+
+    Returns (chunks_map, references, stats). Each canonical chunk stays with
+    the first source it appeared in; references maps every other source that
+    contained a copy to {point id: chunk key} of those canonical chunks.
+    stored, if given, is called with the set of chunk keys and returns
+    {chunk key: point id} of points already in the collection (see
+    Manifest.stored_points); copies of those are references too.
+    """
+    deduplicator = deduplicator or Deduplicator()
+    keys = {source: [chunk_key(getattr(chunk, "text", chunk)) for chunk in chunks]
+            for source, chunks in chunks_map.items()}
+    if stored is not None:
+        deduplicator.use_stored(stored({key for source_keys in keys.values() for key in source_keys}))
+    kept, references = {}, {}
+    dropped_text = 0
+    for source, chunks in chunks_map.items():
+        kept[source] = []
+        for chunk, key in zip(chunks, keys[source]):
+            text = getattr(chunk, "text", chunk)
+            index, new = deduplicator.add(text, source, key)
+            if new:
+                kept[source].append(chunk)
+                continue
+            dropped_text += len(text.encode("utf-8"))
+            if deduplicator.owners[index] != source:
+                references.setdefault(source, {}).setdefault(deduplicator.ids[index], key)
+    return kept, references, deduplicator.stats(dropped_text)
+
+
+def format_stats(stats: dict, dim: int = None) -> str:
+    saved_bytes = stats["text_bytes_saved"] + (stats["saved"] * dim * 4 if dim else 0)
+    return (f"♻️ Dedup: {stats['chunks']} chunks -> {stats['unique']} unique ({stats['exact']} exact, "
+            f"{stats['near']} near duplicates); {stats['saved']} embeddings and ~{saved_bytes / 1e6:.1f} MB saved.")
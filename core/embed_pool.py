@@ -0,0 +1,209 @@
+# core/embed_pool.py
+
+"""Sharded embedding over several processes that share one copy of the weights.
+
+The model is saved once to EMBED_WEIGHTS_DIR and every worker memory-maps
+that file, so N workers cost one set of weights in the page cache. Each
+worker is pinned to its own slice of cores with a matching torch thread
+count, pulls padded batches from a queue and writes its vectors straight
+into a shared-memory result matrix; only row indices cross the queues.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .config import EMBED_BACKEND, EMBED_WEIGHTS_DIR
+from .models import MODEL_NAME, get_model
+
+_lock = threading.Lock()
+_pools = {}
+
+
+def weights_path(model_name: str = MODEL_NAME) -> str:
+    """Save model_name for memory-mapped loading, once, and return the file path."""
+    path = os.path.join(EMBED_WEIGHTS_DIR, model_name.replace("/", "--") + ".pt")
+    if not os.path.exists(path):
+        import torch
+
+        _, model = get_model(model_name)
+        os.makedirs(EMBED_WEIGHTS_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(model, tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _core_slices(workers: int, threads: int) -> list:
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    return [cores[(i * threads) % len(cores):][:threads] for i in range(workers)]
+
+
+def _worker(cores, threads, path, quantize, tasks, done):
+    try:
+        if cores and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)
+        import torch
+
+        from .backends import _mean_pool
+
+        torch.set_num_threads(threads)
+        # mmap keeps the weights in the shared page cache instead of copying
+        # them into this process.
+        model = torch.load(path, mmap=True, weights_only=False)
+        model.eval()
+        if quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        done.put(("ready", model.config.hidden_size))
+    except Exception as e:
+        done.put(("error", f"{type(e).__name__}: {e}"))
+        return
+
+    attached = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        name, rows, dim, indices, inputs = task
+        try:
+            if name not in attached:
+                # Only the latest job's block stays attached.
+                for block in attached.values():
+                    block.close()
+                attached = {name: shared_memory.SharedMemory(name=name)}
+            out = np.ndarray((rows, dim), dtype=np.float32, buffer=attached[name].buf)
+            with torch.inference_mode():
+                outputs = model(**{key: torch.from_numpy(value) for key, value in inputs.items()})
+                out[indices] = _mean_pool(outputs.last_hidden_state.numpy(), inputs["attention_mask"])
+            done.put(("done", len(indices)))
+        except Exception as e:
+            done.put(("error", f"{type(e).__name__}: {e}"))
+    for block in attached.values():
+        block.close()
+
+
+class EmbeddingPool:
+    """N embedding processes fed from one queue; usable as the backend of embed_texts.
+
+    Supports the torch and int8 backends. int8 quantizes inside each worker,
+    so those copies of the weights are not shared.
+    """
+
+    def __init__(self, workers: int, threads: int = None, backend: str = EMBED_BACKEND,
+                 model_name: str = MODEL_NAME):
+        if backend not in ("torch", "int8"):
+            raise ValueError(f"EmbeddingPool supports the torch and int8 backends, not {backend!r}.")
+        self.name = backend
+        self.model_name = model_name
+        self.cache_key = model_name if backend == "torch" else f"{model_name}#int8"
+        self.workers = workers
+        self.threads = threads or max(1, (os.cpu_count() or 1) // workers)
+        self._lock = threading.Lock()
+
+        path = weights_path(model_name)
+        context = multiprocessing.get_context("spawn")
+        self._tasks = context.Queue()
+        self._done = context.Queue()
+        self._processes = [
+            context.Process(
+                target=_worker,
+                args=(cores, self.threads, path, backend == "int8", self._tasks, self._done),
+                name=f"d2v-embed-{i}", daemon=True,
+            )
+            for i, cores in enumerate(_core_slices(workers, self.threads))
+        ]
+        for process in self._processes:
+            process.start()
+        dims = [self._receive("ready") for _ in self._processes]
+        self.dim = dims[0]
+
+    def _receive(self, expected: str):
+        while True:
+            try:
+                kind, value = self._done.get(timeout=5)
+            except Exception:
+                if not all(process.is_alive() for process in self._processes):
+                    self.close()
+                    raise RuntimeError("An embedding worker exited unexpectedly.")
+                continue
+            if kind == "error":
+                self.close()
+                raise RuntimeError(f"Embedding worker failed: {value}")
+            if kind == expected:
+                return value
+
+    def embed_batches(self, batches, total: int, progress=None) -> np.ndarray:
+        """Embed (indices, inputs) batches across the workers and return the matrix."""
+        with self._lock:
+            block = shared_memory.SharedMemory(create=True, size=max(1, total * self.dim * 4))
+            in_flight = done = 0
+            try:
+                for indices, inputs in batches:
+                    # Keep the queue short so padded batches don't pile up in memory.
+                    if in_flight >= self.workers * 2:
+                        done += self._receive("done")
+                        in_flight -= 1
+                        if progress:
+                            progress(done, total)
+                    self._tasks.put((block.name, total, self.dim, indices, inputs))
+                    in_flight += 1
+                while in_flight:
+                    done += self._receive("done")
+                    in_flight -= 1
+                    if progress:
+                        progress(done, total)
+                return np.ndarray((total, self.dim), dtype=np.float32, buffer=block.buf).copy()
+            finally:
+                # On an early exit (e.g. a cancelled job's progress callback
+                # raised), results still in flight must not be read by the
+                # next call as its own.
+                self._drain(in_flight)
+                block.close()
+                block.unlink()
+
+    def _drain(self, count: int):
+        while count and self._processes:
+            try:
+                kind, _ = self._done.get(timeout=5)
+            except Exception:
+                if not all(process.is_alive() for process in self._processes):
+                    self.close()
+                    return
+                continue
+            if kind in ("done", "error"):
+                count -= 1
+
+    def close(self):
+        for process in self._processes:
+            if process.is_alive():
+                self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def get_embedding_pool(workers: int, backend: str = EMBED_BACKEND) -> EmbeddingPool:
+    """Return the shared pool of this size, starting it on first use."""
+    key = (workers, backend)
+    with _lock:
+        if key not in _pools or not _pools[key]._processes:
+            _pools[key] = EmbeddingPool(workers, backend=backend)
+        return _pools[key]
+
+
+@atexit.register
+def _close_pools():
+    for pool in _pools.values():
+        pool.close()
@@ -1,67 +1,124 @@
 # core/embedding.py
 
-import uuid
-import torch
-import requests
-from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, Distance, VectorParams
-from .config import QDRANT_URL, QDRANT_API_KEY, COLLECTION_NAME
+import numpy as np
+from .collection import ensure_collection
+from .config import EMBED_BATCH_SIZE, EMBED_WORKERS
+from .embedding_cache import default_cache
+from .models import MODEL_NAME, get_tokenizer
+from .profiling import span
+from .uploader import QdrantUploader, get_qdrant_client
+from .vectors import EmbeddingBatch
 
-from transformers import AutoTokenizer, AutoModel
+# torch, transformers and qdrant_client are imported inside the functions that
+# need them so that importing this module (and opening the UI) stays fast.
 
-MODEL_NAME = "intfloat/multilingual-e5-base"
+def _with_prefix(text: str, prefix: str = "passage: ") -> str:
+    if "intfloat" in MODEL_NAME:
+        return f"{prefix}{text}"
+    return text
 
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModel.from_pretrained(MODEL_NAME)
+def padded_batches(tokenizer, texts: list, batch_size: int, prefix: str = "passage: "):
+    """Yield (indices, inputs) batches of texts padded to numpy arrays, shortest texts first."""
+    prefixed = [_with_prefix(text, prefix) for text in texts]
+    with span("embed.tokenize"):
+        encoded = tokenizer(prefixed, truncation=True)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    # Sorting by token count keeps each batch close to uniform length,
+    # so little compute is spent on padding.
+    order = sorted(range(len(prefixed)), key=lengths.__getitem__)
 
-def generate_offline_embedding(text: str) -> list:
-    if "intfloat" in MODEL_NAME:
-        text = f"passage: {text}"
-    inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-    with torch.no_grad():
-        outputs = model(**inputs)
-        embeddings = outputs.last_hidden_state.mean(dim=1)
-        normalized = torch.nn.functional.normalize(embeddings, p=2, dim=1)
-    return normalized[0].tolist()
-
-def generate_embeddings_for_chunks(chunks: list) -> list:
-    """Generate embeddings for a list of text chunks without uploading."""
-    results = []
-    for chunk in chunks:
-        embedding = generate_offline_embedding(chunk)
-        results.append({"text": chunk, "embedding": embedding})
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        features = {key: [encoded[key][i] for i in indices] for key in encoded.keys()}
+        with span("embed.pad"):
+            inputs = dict(tokenizer.pad(features, return_tensors="np"))
+        yield indices, inputs
+
+def embed_texts(texts: list, batch_size: int = EMBED_BATCH_SIZE, prefix: str = "passage: ",
+                cache=None, progress=None, backend=None) -> np.ndarray:
+    """Embed texts in length-sorted batches and return a float32 matrix in input order.
+
+    backend defaults to the one named by EMBED_BACKEND (see core.backends);
+    an EmbeddingPool can be passed instead to spread batches over processes.
+    When an EmbeddingCache is given, cached texts skip the model and only the
+    misses are embedded and stored. progress, if given, is called as
+    progress(done, total) after every batch.
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    if backend is None:
+        from .backends import get_backend
+
+        backend = get_backend()
+
+    if cache is not None:
+        cached = cache.get_many(backend.cache_key, prefix, texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if not missing:
+            return np.stack(cached)
+        missing_texts = [texts[i] for i in missing]
+        cached_count = len(texts) - len(missing)
+        missing_progress = None
+        if progress:
+            progress(cached_count, len(texts))
+            missing_progress = lambda done, _: progress(cached_count + done, len(texts))
+        vectors = embed_texts(missing_texts, batch_size=batch_size, prefix=prefix,
+                              progress=missing_progress, backend=backend)
+        cache.put_many(backend.cache_key, prefix, missing_texts, vectors)
+        results = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        results[missing] = vectors
+        for i, vector in enumerate(cached):
+            if vector is not None:
+                results[i] = vector
+        return results
+
+    batches = padded_batches(get_tokenizer(backend.model_name), texts, batch_size, prefix)
+    if hasattr(backend, "embed_batches"):
+        return backend.embed_batches(batches, len(texts), progress)
+
+    results = np.empty((len(texts), backend.dim), dtype=np.float32)
+    done = 0
+    for indices, inputs in batches:
+        with span("embed.forward"):
+            results[indices] = backend.embed(inputs)
+        done += len(indices)
+        if progress:
+            progress(done, len(texts))
     return results
 
-def get_qdrant_client():
-    if QDRANT_API_KEY:
-        return QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-    return QdrantClient(url=QDRANT_URL)
-
-def ensure_collection(client: QdrantClient, vector_size: int):
-    collections = client.get_collections().collections
-    if COLLECTION_NAME not in [c.name for c in collections]:
-        client.recreate_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
-        )
-
-def upload_embeddings_to_qdrant(embeddings: list):
-    if not embeddings:
+def generate_offline_embedding(text: str) -> np.ndarray:
+    return embed_texts([text], batch_size=1)[0]
+
+def generate_embeddings_for_chunks(chunks: list, batch_size: int = EMBED_BATCH_SIZE, cache=None,
+                                   sources: list = None, progress=None,
+                                   workers: int = EMBED_WORKERS) -> EmbeddingBatch:
+    """Generate embeddings for a list of text chunks without uploading.
+
+    chunks may also be core.chunker.Chunk objects, whose page range and
+    character offsets then go into the point payloads. With workers > 1 the
+    batches are sharded over a pool of embedding processes (see
+    core.embed_pool).
+    """
+    texts = [getattr(chunk, "text", chunk) for chunk in chunks]
+    if cache is None:
+        cache = default_cache()
+    backend = None
+    if workers > 1:
+        from .embed_pool import get_embedding_pool
+
+        backend = get_embedding_pool(workers)
+    vectors = embed_texts(texts, batch_size=batch_size, cache=cache, progress=progress, backend=backend)
+    return EmbeddingBatch.from_chunks(chunks, vectors, sources)
+
+def upload_embeddings_to_qdrant(embeddings: EmbeddingBatch, client=None):
+    if not len(embeddings):
         print("⚠️ No embeddings to upload.")
         return
 
-    vector_size = len(embeddings[0]['embedding'])
-    client = get_qdrant_client()
-    ensure_collection(client, vector_size)
-
-    points = []
-    for entry in embeddings:
-        point = PointStruct(
-            id=str(uuid.uuid4()),
-            vector=entry['embedding'],
-            payload={"text": entry['text']}
-        )
-        points.append(point)
-
-    client.upsert(collection_name=COLLECTION_NAME, points=points)
-    print(f"✅ Uploaded {len(points)} chunks to Qdrant.")
+    client = client or get_qdrant_client()
+    ensure_collection(client, embeddings.dim)
+
+    with QdrantUploader(client) as uploader:
+        uploader.upsert_embeddings(embeddings)
+    print(f"✅ Uploaded {uploader.points_sent} chunks to Qdrant ({uploader.rate:.0f} points/sec).")
@@ -0,0 +1,154 @@
+# core/embedding_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .config import EMBED_CACHE_PATH, EMBED_CACHE_MAX_MB, QDRANT_VECTOR_NAME
+
+_LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent float32 vectors keyed by (model, prefix, sha256(text)) with LRU eviction."""
+
+    def __init__(self, path: str, max_bytes: int = EMBED_CACHE_MAX_MB * 1024 * 1024):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                prefix TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, prefix, text_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings (last_used)")
+        self._conn.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_many(self, model: str, prefix: str, texts: list) -> list:
+        """Return cached vectors in input order, with None for every miss."""
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), _LOOKUP_CHUNK):
+                chunk = hashes[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND prefix = ? AND text_hash IN ({placeholders})",
+                    [model, prefix, *chunk],
+                )
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND prefix = ? AND text_hash = ?",
+                    [(now, model, prefix, h) for h in found],
+                )
+                self._conn.commit()
+
+        results = []
+        for h in hashes:
+            blob = found.get(h)
+            if blob is None:
+                self.misses += 1
+                results.append(None)
+            else:
+                self.hits += 1
+                results.append(np.frombuffer(blob, dtype=np.float32))
+        return results
+
+    def put_many(self, model: str, prefix: str, texts: list, vectors: list):
+        now = time.time()
+        rows = [
+            (model, prefix, text_hash(text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()
+        if size <= self.max_bytes or not count:
+            return
+        # Entries are roughly the same size, so drop enough of the least
+        # recently used ones to get back under the cap.
+        excess = count - int(count * self.max_bytes / size)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+
+    def warm_from_qdrant(self, client, collection_name: str, model: str,
+                         prefix: str = "passage: ", batch_size: int = 256) -> int:
+        """Copy every (payload text, vector) pair of a collection into the cache.
+
+        model must be the cache_key of the backend that will read them
+        (core.backends), or the entries are never hit; `d2v warm
+        --from-collection` passes it.
+        """
+        warmed = 0
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=["text"],
+                with_vectors=[QDRANT_VECTOR_NAME] if QDRANT_VECTOR_NAME else True,
+            )
+            pairs = [(p.payload["text"], p.vector[QDRANT_VECTOR_NAME] if QDRANT_VECTOR_NAME else p.vector)
+                     for p in points if p.payload and "text" in p.payload]
+            if pairs:
+                texts, vectors = zip(*pairs)
+                self.put_many(model, prefix, texts, vectors)
+                warmed += len(pairs)
+            if offset is None:
+                return warmed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """Shared cache at EMBED_CACHE_PATH, or None when caching is disabled."""
+    global _default_cache
+    if not EMBED_CACHE_PATH:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache(EMBED_CACHE_PATH)
+        return _default_cache
@@ -0,0 +1,190 @@
+# core/export.py
+
+"""Offline export and import of embeddings.
+
+An export is a directory:
+
+    manifest.json    model, dimension and row count
+    vectors.npy      float32 (rows, dim), loadable with np.load(mmap_mode="r")
+    payloads.jsonl   one {"id", "payload"} object per row
+    offsets.npy      int64 byte offset of every line in payloads.jsonl, plus the end
+
+Both .npy files are written as rows arrive, and their headers are patched
+with the final row count on close, so exporting never holds more than one
+batch in memory. Importing memory-maps the vectors and reads the payload
+lines of one batch at a time.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from .config import COLLECTION_NAME, UPLOAD_BATCH_SIZE
+from .models import MODEL_NAME
+
+FORMAT = "d2v-embeddings"
+VERSION = 1
+_HEADER_SIZE = 128
+
+
+def _npy_header(dtype: np.dtype, shape: tuple) -> bytes:
+    """A version 1.0 .npy header padded to a fixed size, so it can be rewritten in place."""
+    header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape})
+    header = header.encode("latin1").ljust(_HEADER_SIZE - 10 - 1) + b"\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header
+
+
+class _NpyAppender:
+    """Appends rows to a .npy file whose length isn't known up front."""
+
+    def __init__(self, path: str, dtype, row_shape: tuple = ()):
+        self.dtype = np.dtype(dtype)
+        self.row_shape = row_shape
+        self.rows = 0
+        self._file = open(path, "wb")
+        self._file.write(_npy_header(self.dtype, (0, *row_shape)))
+
+    def append(self, rows: np.ndarray):
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        self._file.write(rows.tobytes())
+        self.rows += len(rows)
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(_npy_header(self.dtype, (self.rows, *self.row_shape)))
+        self._file.close()
+
+
+class EmbeddingWriter:
+    """Stream EmbeddingBatch objects into an export directory."""
+
+    def __init__(self, path: str, model: str = MODEL_NAME):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.model = model
+        self.dim = None
+        self._vectors = None
+        self._offsets = _NpyAppender(os.path.join(path, "offsets.npy"), np.int64)
+        self._offsets.append(np.zeros(1, dtype=np.int64))
+        self._payloads = open(os.path.join(path, "payloads.jsonl"), "wb")
+        self._position = 0
+
+    def __len__(self):
+        return self._offsets.rows - 1
+
+    def write(self, embeddings):
+        if not len(embeddings):
+            return
+        if self._vectors is None:
+            self.dim = embeddings.dim
+            self._vectors = _NpyAppender(os.path.join(self.path, "vectors.npy"), np.float32, (self.dim,))
+        elif embeddings.dim != self.dim:
+            raise ValueError(f"Expected {self.dim}-dim vectors, got {embeddings.dim}.")
+
+        lines = [
+            json.dumps({"id": point, "payload": payload}, ensure_ascii=False).encode("utf-8") + b"\n"
+            for point, payload in zip(embeddings.point_ids(), embeddings.payloads())
+        ]
+        self._payloads.write(b"".join(lines))
+        ends = self._position + np.cumsum([len(line) for line in lines], dtype=np.int64)
+        self._position = int(ends[-1])
+        self._offsets.append(ends)
+        self._vectors.append(embeddings.vectors)
+
+    def close(self):
+        if self._vectors is None:
+            self.dim = 0
+            self._vectors = _NpyAppender(os.path.join(self.path, "vectors.npy"), np.float32, (0,))
+        self._vectors.close()
+        self._offsets.close()
+        self._payloads.close()
+        with open(os.path.join(self.path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"format": FORMAT, "version": VERSION, "model": self.model,
+                       "dim": self.dim, "count": len(self)}, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EmbeddingReader:
+    """Memory-mapped view of an export directory."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT:
+            raise ValueError(f"{path} is not a d2v embeddings export.")
+        self.path = path
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self._payloads = open(os.path.join(path, "payloads.jsonl"), "rb")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def dim(self) -> int:
+        return self.manifest["dim"]
+
+    def rows(self, start: int, end: int):
+        """Return (ids, vectors, payloads) for rows start:end; vectors is a memmap slice."""
+        first, last = int(self.offsets[start]), int(self.offsets[end])
+        self._payloads.seek(first)
+        records = [json.loads(line) for line in self._payloads.read(last - first).splitlines()]
+        return [r["id"] for r in records], self.vectors[start:end], [r["payload"] for r in records]
+
+    def batches(self, batch_size: int):
+        for start in range(0, len(self), batch_size):
+            yield self.rows(start, min(start + batch_size, len(self)))
+
+    def close(self):
+        self._payloads.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_embeddings(batches, path: str) -> int:
+    """Write an EmbeddingBatch (or an iterable of them) to path; returns the row count."""
+    from .vectors import EmbeddingBatch
+
+    if isinstance(batches, EmbeddingBatch):
+        batches = [batches]
+    with EmbeddingWriter(path) as writer:
+        for batch in batches:
+            writer.write(batch)
+    print(f"✅ Exported {len(writer)} embeddings to {path}.")
+    return len(writer)
+
+
+def import_embeddings(path: str, client=None, collection_name: str = COLLECTION_NAME,
+                      batch_size: int = UPLOAD_BATCH_SIZE * 4, progress=None) -> int:
+    """Bulk-upload an export to Qdrant, one memory-mapped batch at a time."""
+    from .collection import ensure_collection
+    from .uploader import QdrantUploader, get_qdrant_client
+
+    client = client or get_qdrant_client()
+    with EmbeddingReader(path) as reader:
+        if reader.manifest["model"] != MODEL_NAME:
+            print(f"⚠️ {path} was embedded with {reader.manifest['model']}, not {MODEL_NAME}.")
+        if not len(reader):
+            print("⚠️ No embeddings to import.")
+            return 0
+        ensure_collection(client, reader.dim, collection_name)
+        done = 0
+        with QdrantUploader(client, collection_name) as uploader:
+            for ids, vectors, payloads in reader.batches(batch_size):
+                uploader.upsert_columns(ids, vectors, payloads)
+                done += len(ids)
+                if progress:
+                    progress(done, len(reader))
+    print(f"✅ Imported {uploader.points_sent} points into {collection_name} ({uploader.rate:.0f} points/sec).")
+    return uploader.points_sent
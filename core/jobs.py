@@ -0,0 +1,391 @@
+# core/jobs.py
+
+"""Resumable ingestion jobs, checkpointed to a local SQLite journal.
+
+A job is a fixed list of files. As it runs, the journal records:
+
+- each file's parsed chunks, so a resumed job doesn't parse it again;
+- each batch's vectors as soon as they are embedded, until Qdrant has
+  acknowledged them;
+- which batches and which files are complete.
+
+After a crash, a cancel or a restart, run_job() skips finished files,
+re-sends embedded batches from the journal, and only embeds what never
+was. Journal data of a job is dropped once it finishes.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+
+import numpy as np
+
+from .chunker import Chunk
+from .config import COLLECTION_NAME, EMBED_BATCH_SIZE, JOB_JOURNAL_PATH, PARSE_WORKERS
+
+FILES_PER_ROUND = 64
+
+
+class JobJournal:
+    """Jobs, their files and their batch checkpoints."""
+
+    def __init__(self, path: str = JOB_JOURNAL_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                collection TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created REAL NOT NULL,
+                updated REAL NOT NULL,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                source TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                chunks BLOB,
+                done INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                PRIMARY KEY (job_id, path)
+            );
+            CREATE TABLE IF NOT EXISTS batches (
+                job_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                batch_key TEXT NOT NULL,
+                vectors BLOB,
+                sent INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (job_id, source, batch_key)
+            );
+        """)
+        if "error" not in {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}:
+            # Journals written before unparseable files were recorded.
+            self._conn.execute("ALTER TABLE files ADD COLUMN error TEXT")
+        self._conn.commit()
+
+    def create(self, files, collection: str = COLLECTION_NAME, chunks_map: dict = None) -> str:
+        """Start a job over files, a list of paths or (path, size, mtime_ns[, source]) tuples.
+
+        A file's source (its name in Qdrant) defaults to its file name.
+
+        chunks_map, if given, is {source: [Chunk]} already parsed for those
+        files (as in the GUI); it is stored so the job never parses them.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        rows = []
+        for position, entry in enumerate(files):
+            path, size, mtime_ns, *name = entry if isinstance(entry, tuple) else (entry, *_signature(entry))
+            source = name[0] if name else os.path.basename(path)
+            chunks = chunks_map.get(source) if chunks_map is not None else None
+            rows.append((job_id, position, path, source, size, mtime_ns,
+                         _pack_chunks(chunks) if chunks is not None else None))
+        with self._lock:
+            self._conn.execute("INSERT INTO jobs VALUES (?, ?, 'pending', ?, ?, NULL)", (job_id, collection, now, now))
+            self._conn.executemany("INSERT OR REPLACE INTO files (job_id, position, path, source, size, mtime_ns, chunks) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+        return job_id
+
+    def job(self, job_id: str) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT job_id, collection, status, created, updated, error FROM jobs "
+                                     "WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"No job {job_id!r} in {self.path}.")
+            files, done, failed = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(done), 0), COUNT(error) FROM files WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        keys = ("job_id", "collection", "status", "created", "updated", "error")
+        return {**dict(zip(keys, row)), "files": files, "files_done": done, "files_failed": failed}
+
+    def jobs(self, collection: str = None, unfinished: bool = False) -> list:
+        """All jobs (newest first), optionally only those of collection that haven't finished."""
+        query, args = "SELECT job_id FROM jobs WHERE 1 = 1", []
+        if collection is not None:
+            query += " AND collection = ?"
+            args.append(collection)
+        if unfinished:
+            query += " AND status != 'done'"
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(query + " ORDER BY created DESC", args)]
+        return [self.job(job_id) for job_id in ids]
+
+    def set_status(self, job_id: str, status: str, error: str = None):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = ?, updated = ?, error = ? WHERE job_id = ?",
+                               (status, time.time(), error, job_id))
+            if status == "done":
+                # Chunks and vectors are only needed to resume.
+                self._conn.execute("UPDATE files SET chunks = NULL WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM batches WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+    def files(self, job_id: str) -> list:
+        """[(path, source, size, mtime_ns, parsed, done)] in job order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, source, size, mtime_ns, chunks IS NOT NULL, done FROM files "
+                "WHERE job_id = ? ORDER BY position", (job_id,)
+            )
+            return [(path, source, size, mtime_ns, bool(parsed), bool(done))
+                    for path, source, size, mtime_ns, parsed, done in rows]
+
+    def store_chunks(self, job_id: str, path: str, chunks: list, size: int = None, mtime_ns: int = None):
+        with self._lock:
+            if size is not None:
+                self._conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE job_id = ? AND path = ?",
+                                   (size, mtime_ns, job_id, path))
+            self._conn.execute("UPDATE files SET chunks = ? WHERE job_id = ? AND path = ?",
+                               (_pack_chunks(chunks), job_id, path))
+            self._conn.commit()
+
+    def chunks(self, job_id: str, path: str) -> list:
+        with self._lock:
+            row = self._conn.execute("SELECT chunks FROM files WHERE job_id = ? AND path = ?",
+                                     (job_id, path)).fetchone()
+        return _unpack_chunks(row[0]) if row and row[0] is not None else None
+
+    def fail_file(self, job_id: str, path: str, error: str):
+        """Mark a file that could not be parsed as done, so the rest of the job can finish."""
+        with self._lock:
+            self._conn.execute("UPDATE files SET chunks = NULL, done = 1, error = ? WHERE job_id = ? AND path = ?",
+                               (error, job_id, path))
+            self._conn.commit()
+
+    def failed(self, job_id: str) -> dict:
+        """{path: error} of the files that could not be parsed."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT path, error FROM files WHERE job_id = ? AND error IS NOT NULL",
+                                           (job_id,)))
+
+    def reset_file(self, job_id: str, path: str, source: str):
+        """Forget what was checkpointed for a file that changed since the job started."""
+        with self._lock:
+            self._conn.execute("UPDATE files SET chunks = NULL, done = 0, error = NULL WHERE job_id = ? AND path = ?",
+                               (job_id, path))
+            self._conn.execute("DELETE FROM batches WHERE job_id = ? AND source = ?", (job_id, source))
+            self._conn.commit()
+
+    def checkpoint(self, job_id: str) -> "JobCheckpoint":
+        return JobCheckpoint(self, job_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobCheckpoint:
+    """What sync_documents needs to skip completed work of one job."""
+
+    def __init__(self, journal: JobJournal, job_id: str):
+        self.journal = journal
+        self.job_id = job_id
+        self._conn = journal._conn
+        self._lock = journal._lock
+
+    def done(self, source: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(done) FROM files WHERE job_id = ? AND source = ?",
+                                     (self.job_id, source)).fetchone()
+        return bool(row and row[0])
+
+    def batch(self, source: str, key: str, rows: int):
+        """(sent, vectors) of a batch; vectors are the journalled embeddings of an unsent batch, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT sent, vectors FROM batches WHERE job_id = ? AND source = ? "
+                                     "AND batch_key = ?", (self.job_id, source, key)).fetchone()
+        if row is None:
+            return False, None
+        sent, blob = row
+        return bool(sent), (np.frombuffer(blob, dtype=np.float32).reshape(rows, -1) if blob is not None else None)
+
+    def embedded(self, source: str, key: str, vectors: np.ndarray):
+        blob = np.ascontiguousarray(vectors, dtype=np.float32).tobytes()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO batches VALUES (?, ?, ?, ?, 0)", (self.job_id, source, key, blob))
+            self._conn.commit()
+
+    def sent(self, source: str, key: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO batches VALUES (?, ?, ?, NULL, 1)", (self.job_id, source, key))
+            self._conn.commit()
+
+    def finish(self, source: str):
+        with self._lock:
+            self._conn.execute("UPDATE files SET done = 1 WHERE job_id = ? AND source = ?", (self.job_id, source))
+            self._conn.execute("DELETE FROM batches WHERE job_id = ? AND source = ?", (self.job_id, source))
+            self._conn.commit()
+
+
+class _Progress:
+    """Forwards to a progress bar and remembers what its setValue raised (e.g. a cancel)."""
+
+    def __init__(self, bar):
+        self.bar = bar
+        self.error = None
+
+    def setValue(self, value):
+        try:
+            self.bar.setValue(value)
+        except BaseException as e:
+            self.error = e
+            raise
+
+
+def _parse(paths: list, sources: list, progress, workers: int) -> dict:
+    """{source: [Chunk]} of paths; a file that can't be parsed maps to its exception instead."""
+    from .parser import parse_multiple_pdfs
+
+    progress = _Progress(progress) if progress is not None else None
+    try:
+        return parse_multiple_pdfs(paths, progress, workers=workers, with_metadata=True, sources=sources)
+    except Exception as e:
+        if progress is not None and progress.error is e:
+            raise
+    # Some file is broken: parse them one at a time to tell which.
+    parsed = {}
+    for path, source in zip(paths, sources):
+        try:
+            parsed.update(parse_multiple_pdfs([path], progress, workers=workers, with_metadata=True,
+                                              sources=[source]))
+        except Exception as e:
+            if progress is not None and progress.error is e:
+                raise
+            parsed[source] = e
+    return parsed
+
+
+def _signature(path: str):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _pack_chunks(chunks: list) -> bytes:
+    rows = [[c.text, c.page_start, c.page_end, c.char_start, c.char_end] if isinstance(c, Chunk) else c
+            for c in chunks]
+    return zlib.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"), 3)
+
+
+def _unpack_chunks(blob: bytes) -> list:
+    return [Chunk(*row) if isinstance(row, list) else row for row in json.loads(zlib.decompress(blob))]
+
+
+_default_journal = None
+_default_lock = threading.Lock()
+
+
+def default_journal() -> JobJournal:
+    """Shared journal at JOB_JOURNAL_PATH."""
+    global _default_journal
+    with _default_lock:
+        if _default_journal is None:
+            _default_journal = JobJournal(JOB_JOURNAL_PATH)
+        return _default_journal
+
+
+def run_job(job_id: str, journal: JobJournal = None, client=None, manifest=None, workers: int = PARSE_WORKERS,
+            batch_size: int = EMBED_BATCH_SIZE, progress=None, parse_progress=None, on_round=None,
+            precomputed=None) -> dict:
+    """Run or resume a job and return its sync totals.
+
+    Files are processed in fixed rounds of FILES_PER_ROUND, so a resumed job
+    deduplicates exactly as the first attempt did. progress is passed to
+    sync_documents, and so is precomputed, an EmbeddingBatch whose vectors
+    are reused instead of embedding those texts again; on_round(files_done,
+    files_total, chunks) is called after each round. A file that can't be parsed is skipped and recorded
+    as failed; it is not added to the manifest, so the next scan tries it
+    again. If the run stops early the job is left "interrupted" with the
+    reason, ready to be resumed.
+    """
+    from .manifest import Manifest, sync_documents
+
+    journal = journal or default_journal()
+    manifest = manifest or Manifest()
+    collection = journal.job(job_id)["collection"]
+    files = journal.files(job_id)
+    checkpoint = journal.checkpoint(job_id)
+    totals = {"files": len(files), "chunks": 0, "upserted": 0, "deleted": 0, "unchanged": 0,
+              "duplicates": 0, "bytes_saved": 0, "failed": 0}
+    journal.set_status(job_id, "running")
+    try:
+        for start in range(0, len(files), FILES_PER_ROUND):
+            round_files = files[start:start + FILES_PER_ROUND]
+            if all(done for *_, done in round_files):
+                continue
+
+            to_parse, to_parse_sources, signatures = [], [], []
+            for path, source, size, mtime_ns, parsed, done in round_files:
+                if done:
+                    continue
+                if not os.path.exists(path):
+                    print(f"⚠️ {path} disappeared; skipping it.")
+                    checkpoint.finish(source)
+                    continue
+                # Taken before parsing: if the file changes while it is read,
+                # the manifest keeps the older signature and the next scan
+                # picks the change up.
+                signature = _signature(path)
+                if signature != (size, mtime_ns):
+                    # Changed since the job started: its checkpoints are stale.
+                    journal.reset_file(job_id, path, source)
+                    parsed = False
+                if not parsed:
+                    to_parse.append(path)
+                    to_parse_sources.append(source)
+                    signatures.append(signature)
+            if to_parse:
+                parsed_map = _parse(to_parse, to_parse_sources, parse_progress, workers)
+                for path, source, signature in zip(to_parse, to_parse_sources, signatures):
+                    chunks = parsed_map[source]
+                    if isinstance(chunks, Exception):
+                        error = str(chunks) or type(chunks).__name__
+                        print(f"⚠️ Could not parse {path} ({error}); skipping it.")
+                        journal.fail_file(job_id, path, error)
+                        continue
+                    journal.store_chunks(job_id, path, chunks, *signature)
+
+            # A file that failed keeps whatever points it had.
+            failed = journal.failed(job_id)
+            chunks_map = {source: journal.chunks(job_id, path) or [] for path, source, *_ in round_files
+                          if path not in failed}
+            result = sync_documents(chunks_map, client=client, manifest=manifest, collection=collection,
+                                    batch_size=batch_size, progress=progress, checkpoint=checkpoint,
+                                    precomputed=precomputed)
+            for key in ("upserted", "deleted", "unchanged", "duplicates", "bytes_saved"):
+                totals[key] += result[key]
+            totals["chunks"] += sum(len(chunks) for chunks in chunks_map.values())
+            # The signatures journalled with the chunks that were sent.
+            for path, source, size, mtime_ns, *_ in journal.files(job_id)[start:start + FILES_PER_ROUND]:
+                if os.path.exists(path) and path not in failed:
+                    manifest.record_file(path, source, size, mtime_ns, collection)
+            if on_round:
+                on_round(min(start + FILES_PER_ROUND, len(files)), len(files), totals["chunks"])
+    except BaseException as e:
+        journal.set_status(job_id, "interrupted", str(e) or type(e).__name__)
+        raise
+    totals["failed"] = len(journal.failed(job_id))
+    journal.set_status(job_id, "done")
+    return totals
+
+
+def resume_jobs(collection: str = COLLECTION_NAME, journal: JobJournal = None, **kwargs) -> list:
+    """Resume every unfinished job of collection, oldest first; returns their totals."""
+    journal = journal or default_journal()
+    results = []
+    for job in reversed(journal.jobs(collection, unfinished=True)):
+        print(f"⏯️ Resuming job {job['job_id']} ({job['files_done']}/{job['files']} file(s) done).")
+        results.append(run_job(job["job_id"], journal, **kwargs))
+    return results
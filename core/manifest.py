@@ -0,0 +1,366 @@
+# core/manifest.py
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+from .config import COLLECTION_NAME, MANIFEST_PATH, EMBED_BATCH_SIZE, DEDUP, JOB_BATCH_SIZE
+from .embedding_cache import text_hash
+
+# Fixed namespace so the same (source, text) maps to the same point id on
+# every machine and every run.
+POINT_NAMESPACE = uuid.UUID("8d5f3a52-6a0e-4c8e-9a43-2f0b9c1d7e61")
+
+
+def point_id(source: str, text: str) -> str:
+    """Deterministic Qdrant id for a chunk of a source file.
+
+    The id depends on the chunk content rather than its position, so editing
+    one page of a document does not renumber every chunk after it.
+    """
+    return str(uuid.uuid5(POINT_NAMESPACE, f"{source}\0{text_hash(text)}"))
+
+
+def chunk_location(chunk):
+    """A Chunk's location as the manifest stores it, or None for a plain text."""
+    return json.dumps(chunk.location(), sort_keys=True) if hasattr(chunk, "location") else None
+
+
+class Manifest:
+    """Point ids (with chunk locations and keys) each source file contributed to each collection."""
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS manifest (
+                collection TEXT NOT NULL,
+                source TEXT NOT NULL,
+                point_id TEXT NOT NULL,
+                location TEXT,
+                chunk_key BLOB,
+                PRIMARY KEY (collection, source, point_id)
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(manifest)")}
+        if "location" not in columns:
+            # Manifests written before chunk locations were tracked.
+            self._conn.execute("ALTER TABLE manifest ADD COLUMN location TEXT")
+        if "chunk_key" not in columns:
+            # Or before stored points could be deduplicated against.
+            self._conn.execute("ALTER TABLE manifest ADD COLUMN chunk_key BLOB")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS manifest_chunk_key ON manifest (collection, chunk_key)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                collection TEXT NOT NULL,
+                path TEXT NOT NULL,
+                source TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                PRIMARY KEY (collection, path)
+            )
+        """)
+        self._conn.commit()
+
+    def point_ids(self, source: str, collection: str = COLLECTION_NAME) -> set:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT point_id FROM manifest WHERE collection = ? AND source = ?",
+                (collection, source),
+            )
+            return {row[0] for row in rows}
+
+    def locations(self, source: str, collection: str = COLLECTION_NAME) -> dict:
+        """{point_id: location} of a source, as recorded by replace()."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT point_id, location FROM manifest WHERE collection = ? AND source = ?",
+                (collection, source),
+            )
+            return dict(rows.fetchall())
+
+    def sources(self, collection: str = COLLECTION_NAME) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT source FROM manifest WHERE collection = ? ORDER BY source",
+                (collection,),
+            )
+            return [row[0] for row in rows]
+
+    def referenced_elsewhere(self, ids, source: str, collection: str = COLLECTION_NAME) -> set:
+        """The subset of ids that some other source also uses (deduplicated chunks)."""
+        return set(self.point_sources(ids, collection, exclude=source))
+
+    def point_sources(self, ids, collection: str = COLLECTION_NAME, exclude: str = None) -> dict:
+        """{point_id: [sources]} for the ids any source uses, optionally ignoring one source."""
+        ids = list(ids)
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT point_id, source FROM manifest WHERE collection = ? AND source != ? "
+                    f"AND point_id IN ({','.join('?' * len(chunk))}) ORDER BY source",
+                    (collection, exclude if exclude is not None else "\0", *chunk),
+                )
+                for pid, source in rows:
+                    found.setdefault(pid, []).append(source)
+        return found
+
+    def stored_points(self, keys, collection: str = COLLECTION_NAME, exclude=()) -> dict:
+        """{chunk key: point id} of points some source already uses for those chunk keys.
+
+        Rows of the sources in exclude (those being synced) are ignored.
+        """
+        keys = list(keys)
+        exclude = set(exclude)
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT chunk_key, point_id, source FROM manifest WHERE collection = ? "
+                    f"AND chunk_key IN ({','.join('?' * len(chunk))}) ORDER BY point_id",
+                    (collection, *chunk),
+                )
+                for key, pid, source in rows:
+                    if source not in exclude:
+                        found.setdefault(key, pid)
+        return found
+
+    def replace(self, source: str, points: dict, collection: str = COLLECTION_NAME):
+        """Record a source's points as {point_id: (location, chunk key)}; the location is None for plain texts."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM manifest WHERE collection = ? AND source = ?", (collection, source)
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO manifest (collection, source, point_id, location, chunk_key) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(collection, source, pid, location, key) for pid, (location, key) in points.items()],
+            )
+            self._conn.commit()
+
+    def file_signature(self, path: str, collection: str = COLLECTION_NAME):
+        """(size, mtime_ns) recorded for a file at its last successful ingest, or None."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT size, mtime_ns FROM files WHERE collection = ? AND path = ?",
+                (collection, path),
+            ).fetchone()
+
+    def record_file(self, path: str, source: str, size: int, mtime_ns: int, collection: str = COLLECTION_NAME):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                (collection, path, source, size, mtime_ns),
+            )
+            self._conn.commit()
+
+    def tracked_files(self, collection: str = COLLECTION_NAME) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT path, source FROM files WHERE collection = ?", (collection,))
+            return dict(rows.fetchall())
+
+    def forget_file(self, path: str, collection: str = COLLECTION_NAME):
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE collection = ? AND path = ?", (collection, path))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def plan_sync(manifest: Manifest, source: str, chunks: list, collection: str = COLLECTION_NAME,
+              references=None):
+    """Return (chunks to upsert, stale point ids to delete, current, moved) for one source.
+
+    current maps every point id the source now uses to its location and
+    chunk key, in the form Manifest.replace() records.
+
+    chunks are texts or core.chunker.Chunk objects. Point ids depend only on
+    the text, so a Chunk whose text is unchanged but whose pages or offsets
+    moved (e.g. a page was inserted before it) is not re-sent; moved lists
+    those as (point id, new location) so their payloads can be updated.
+    references are {point id: chunk key} of deduplicated chunks whose
+    canonical point belongs to another source; the source records them
+    but does not upsert them.
+    """
+    from .dedup import chunk_key
+
+    previous = manifest.locations(source, collection)
+    current = {}
+    for chunk in chunks:
+        current.setdefault(point_id(source, getattr(chunk, "text", chunk)), chunk)
+    changed = [chunk for pid, chunk in current.items() if pid not in previous]
+    moved = [(pid, chunk.location()) for pid, chunk in current.items()
+             if pid in previous and hasattr(chunk, "location") and previous[pid] != chunk_location(chunk)]
+    current_ids = {pid: (chunk_location(chunk), chunk_key(getattr(chunk, "text", chunk)))
+                   for pid, chunk in current.items()}
+    for pid, key in (references or {}).items():
+        current_ids.setdefault(pid, (None, key))
+    stale = sorted(previous.keys() - current_ids.keys())
+    return changed, stale, current_ids, moved
+
+
+def delete_stale(uploader, manifest: Manifest, source: str, stale: list, collection: str,
+                 shared: set, disowned: set) -> list:
+    """Delete a source's stale points and return their ids.
+
+    Points another source still uses stay; they are added to shared (their
+    "sources" payload needs refreshing) and disowned (their owner may have
+    been this source), for refresh_shared().
+    """
+    kept = manifest.referenced_elsewhere(stale, source, collection)
+    shared.update(kept)
+    disowned.update(kept)
+    stale = [pid for pid in stale if pid not in kept]
+    uploader.delete(stale)
+    return stale
+
+
+def refresh_shared(uploader, manifest: Manifest, shared: set, disowned: set, collection: str):
+    """Rewrite the "sources" payload of deduplicated points from the manifest."""
+    owners = {}
+    if disowned:
+        for record in uploader.client.retrieve(collection, ids=sorted(disowned), with_payload=["source"]):
+            owners[str(record.id)] = (record.payload or {}).get("source")
+    groups = {}
+    for pid, sources in manifest.point_sources(shared, collection).items():
+        # A point whose owning file no longer has the chunk moves to one that does.
+        owner = owners.get(pid)
+        new_owner = sources[0] if owner is not None and owner not in sources else None
+        groups.setdefault((tuple(sources), new_owner), []).append(pid)
+    for (sources, new_owner), ids in groups.items():
+        payload = {"sources": list(sources)}
+        if new_owner is not None:
+            payload["source"] = new_owner
+        uploader.set_payload(payload, ids)
+
+
+def sync_documents(chunks_map: dict, client=None, manifest: Manifest = None,
+                   collection: str = COLLECTION_NAME, batch_size: int = EMBED_BATCH_SIZE,
+                   progress=None, dedup: bool = DEDUP, checkpoint=None, precomputed=None) -> dict:
+    """Bring a collection in line with {source: chunks}, touching only what changed.
+
+    chunks are texts or core.chunker.Chunk objects; a Chunk's page range and
+    character offsets are stored in its payload. Unchanged chunks are
+    neither embedded nor sent (if only their location moved, just their
+    payload is updated); chunks that disappeared from a source are
+    deleted from the collection. With dedup, duplicate
+    chunks across the given sources are embedded once and their point lists
+    every source in its "sources" payload (see core.dedup); exact copies of
+    chunks other sources already stored reuse those points. progress, if
+    given, is called as progress(chunks_done, chunks_total) after each
+    batch and each source.
+
+    Changed chunks are embedded and sent JOB_BATCH_SIZE at a time. With a
+    checkpoint (core.jobs.JobCheckpoint), each batch's vectors are
+    journalled before sending and the batch is marked once Qdrant has it,
+    so a resumed job neither re-embeds nor re-sends; finished sources are
+    skipped. precomputed is an EmbeddingBatch already made for these chunks
+    (as the GUI has); a batch whose texts are all in it is not embedded
+    again.
+    """
+    from .dedup import dedup_chunks, format_stats
+    from .collection import ensure_collection
+    from .embedding import generate_embeddings_for_chunks
+    from .uploader import QdrantUploader
+    from .vectors import EmbeddingBatch
+
+    manifest = manifest or Manifest()
+    totals = {"upserted": 0, "deleted": 0, "unchanged": 0, "moved": 0, "duplicates": 0, "bytes_saved": 0}
+    collection_ready = False
+    total_chunks = sum(len(chunks) for chunks in chunks_map.values())
+    done_chunks = 0
+    references, stats, dim = {}, None, None
+    rows = {text: row for row, text in enumerate(precomputed.texts)} if precomputed is not None else {}
+    if dedup and total_chunks:
+        originals = chunks_map
+        chunks_map, references, stats = dedup_chunks(
+            chunks_map, stored=lambda keys: manifest.stored_points(keys, collection, exclude=originals)
+        )
+    # Shared points whose "sources" payload has to be refreshed, and those
+    # a source dropped, which may have been its own.
+    shared, disowned = set(), set()
+
+    with QdrantUploader(client, collection_name=collection) as uploader:
+        for source, chunks in chunks_map.items():
+            source_chunks = len(originals[source]) if stats else len(chunks)
+            if checkpoint is not None and checkpoint.done(source):
+                done_chunks += source_chunks
+                if progress:
+                    progress(done_chunks, total_chunks)
+                continue
+            source_refs = references.get(source, ())
+            changed, stale, current_ids, moved = plan_sync(manifest, source, chunks, collection, source_refs)
+            ref_ids = set(source_refs)
+            shared.update(ref_ids)
+            sent = 0
+            for start in range(0, len(changed), JOB_BATCH_SIZE):
+                batch = changed[start:start + JOB_BATCH_SIZE]
+                key, vectors = None, None
+                if checkpoint is not None:
+                    # Keyed by content, so the same batch is recognised however the run was cut short.
+                    key = text_hash("".join(point_id(source, getattr(chunk, "text", chunk)) for chunk in batch))
+                    already_sent, vectors = checkpoint.batch(source, key, len(batch))
+                    if already_sent:
+                        continue
+                if vectors is None and rows:
+                    batch_rows = [rows.get(getattr(chunk, "text", chunk)) for chunk in batch]
+                    if None not in batch_rows:
+                        vectors = precomputed.vectors[batch_rows]
+                        if checkpoint is not None:
+                            checkpoint.embedded(source, key, vectors)
+                if vectors is None:
+                    embeddings = generate_embeddings_for_chunks(batch, batch_size=batch_size,
+                                                                sources=[source] * len(batch))
+                    if checkpoint is not None:
+                        checkpoint.embedded(source, key, embeddings.vectors)
+                else:
+                    embeddings = EmbeddingBatch.from_chunks(batch, vectors, [source] * len(batch))
+                dim = embeddings.dim
+                if not collection_ready:
+                    ensure_collection(uploader.client, embeddings.dim, collection)
+                    collection_ready = True
+                uploader.upsert_embeddings(embeddings)
+                sent += len(batch)
+                if checkpoint is not None:
+                    uploader.flush()
+                    checkpoint.sent(source, key)
+                if progress:
+                    # Batches skipped on resume count as done too.
+                    progress(done_chunks + start + len(batch), total_chunks)
+            if moved:
+                uploader.set_payloads(moved)
+            if stale:
+                stale = delete_stale(uploader, manifest, source, stale, collection, shared, disowned)
+            # The manifest may only move forward once Qdrant has the points.
+            uploader.flush()
+            manifest.replace(source, current_ids, collection)
+            if checkpoint is not None:
+                checkpoint.finish(source)
+
+            totals["upserted"] += sent
+            totals["deleted"] += len(stale)
+            totals["moved"] += len(moved)
+            totals["unchanged"] += len([pid for pid in current_ids if pid not in ref_ids]) - len(changed)
+            done_chunks += source_chunks
+            if progress:
+                progress(done_chunks, total_chunks)
+
+        refresh_shared(uploader, manifest, shared, disowned, collection)
+
+    print(f"✅ Synced {len(chunks_map)} file(s): {totals['upserted']} upserted, "
+          f"{totals['deleted']} deleted, {totals['unchanged']} unchanged ({totals['moved']} moved).")
+    if stats:
+        totals["duplicates"] = stats["saved"]
+        totals["bytes_saved"] = stats["text_bytes_saved"] + (stats["saved"] * dim * 4 if dim else 0)
+        print(format_stats(stats, dim))
+    return totals
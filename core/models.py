@@ -0,0 +1,62 @@
+# core/models.py
+
+import threading
+import time
+
+MODEL_NAME = "intfloat/multilingual-e5-base"
+
+_lock = threading.Lock()
+_loaded = {}
+_tokenizers = {}
+
+
+def is_loaded(name: str = MODEL_NAME) -> bool:
+    return name in _loaded
+
+
+def get_tokenizer(name: str = MODEL_NAME):
+    """Return the (fast) tokenizer for name without loading model weights."""
+    tokenizer = _tokenizers.get(name)
+    if tokenizer is not None:
+        return tokenizer
+    with _lock:
+        if name not in _tokenizers:
+            from transformers import AutoTokenizer
+
+            _tokenizers[name] = AutoTokenizer.from_pretrained(name)
+        return _tokenizers[name]
+
+
+def get_model(name: str = MODEL_NAME):
+    """Return (tokenizer, model) for name, loading it on first use.
+
+    torch and transformers are only imported here, so importing core modules
+    stays cheap. Concurrent callers wait for a single load.
+    """
+    loaded = _loaded.get(name)
+    if loaded is not None:
+        return loaded
+    tokenizer = get_tokenizer(name)
+    with _lock:
+        if name not in _loaded:
+            from transformers import AutoModel
+
+            model = AutoModel.from_pretrained(name)
+            model.eval()
+            _loaded[name] = (tokenizer, model)
+        return _loaded[name]
+
+
+def warm_up(name: str = MODEL_NAME, background: bool = False):
+    """Load a model now, or in a daemon thread when background is True."""
+    if not background:
+        return get_model(name)
+    thread = threading.Thread(target=get_model, args=(name,), name="d2v-model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    warm_up()
+    print(f"✅ Loaded {MODEL_NAME} in {time.perf_counter() - start:.1f}s.")
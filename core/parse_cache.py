@@ -0,0 +1,203 @@
+# core/parse_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from .config import PARSE_CACHE_MAX_MB, PARSE_CACHE_PATH
+
+_LOOKUP_CHUNK = 500
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _pack(value) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), 3)
+
+
+def _unpack(blob: bytes):
+    return json.loads(zlib.decompress(blob))
+
+
+class ParseCache:
+    """Persistent extracted page texts, keyed by PDF fingerprint, with LRU eviction.
+
+    A file whose size and mtime match what was recorded is answered without
+    reading it. Otherwise its sha256 is checked, so copied or touched files
+    still hit. Large files also store each page under a hash of its content
+    stream, so an edited file only re-extracts the pages that changed.
+    """
+
+    def __init__(self, path: str, max_bytes: int = PARSE_CACHE_MAX_MB * 1024 * 1024):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.page_hits = 0
+        self.page_misses = 0
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                content_hash TEXT PRIMARY KEY,
+                pages BLOB NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                page_hash TEXT PRIMARY KEY,
+                text BLOB NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS documents_lru ON documents (last_used);
+            CREATE INDEX IF NOT EXISTS pages_lru ON pages (last_used);
+        """)
+        self._conn.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def page_hit_rate(self) -> float:
+        total = self.page_hits + self.page_misses
+        return self.page_hits / total if total else 0.0
+
+    def _document(self, content_hash: str):
+        row = self._conn.execute("SELECT pages FROM documents WHERE content_hash = ?", (content_hash,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE documents SET last_used = ? WHERE content_hash = ?", (time.time(), content_hash))
+        return [tuple(page) for page in _unpack(row[0])]
+
+    def lookup(self, path: str):
+        """Return the cached [(page_number, text)] of path, or None on a miss."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, content_hash FROM files WHERE path = ?", (path,)
+            ).fetchone()
+            if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+                pages = self._document(row[2])
+                if pages is not None:
+                    self._conn.commit()
+                    self.hits += 1
+                    return pages
+
+        content_hash = file_hash(path)
+        with self._lock:
+            pages = self._document(content_hash)
+            if pages is not None:
+                self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                   (path, stat.st_size, stat.st_mtime_ns, content_hash))
+                self._conn.commit()
+                self.hits += 1
+                return pages
+            self.misses += 1
+            # Remembered so store() doesn't hash the file a second time.
+            self._fingerprints[path] = (stat.st_size, stat.st_mtime_ns, content_hash)
+            return None
+
+    def page_texts(self, page_hashes: list) -> dict:
+        """Return {page_hash: text} for the page hashes that are cached."""
+        found = {}
+        with self._lock:
+            for start in range(0, len(page_hashes), _LOOKUP_CHUNK):
+                chunk = page_hashes[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT page_hash, text FROM pages WHERE page_hash IN ({placeholders})", chunk
+                )
+                found.update((h, zlib.decompress(blob).decode("utf-8")) for h, blob in rows)
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE pages SET last_used = ? WHERE page_hash = ?",
+                                       [(now, h) for h in found])
+                self._conn.commit()
+        self.page_hits += len(found)
+        self.page_misses += len(page_hashes) - len(found)
+        return found
+
+    def store(self, path: str, pages: list, page_hashes: list = None):
+        """Record the pages extracted from path (and, for large files, each page by hash)."""
+        path = os.path.abspath(path)
+        fingerprint = self._fingerprints.pop(path, None)
+        if fingerprint is None:
+            stat = os.stat(path)
+            fingerprint = (stat.st_size, stat.st_mtime_ns, file_hash(path))
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO documents VALUES (?, ?, ?)",
+                               (fingerprint[2], _pack(pages), now))
+            self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (path, *fingerprint))
+            if page_hashes:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?)",
+                    [(h, zlib.compress(text.encode("utf-8"), 3), now) for h, (_, text) in zip(page_hashes, pages)],
+                )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        tables = (("documents", "content_hash", "pages"), ("pages", "page_hash", "text"))
+        usage = [
+            self._conn.execute(f"SELECT COUNT(*), COALESCE(SUM(LENGTH({column})), 0) FROM {table}").fetchone()
+            for table, _, column in tables
+        ]
+        total = sum(size for _, size in usage)
+        if total <= self.max_bytes:
+            return
+        # Trim both tables by the same share, least recently used first.
+        keep = self.max_bytes / total
+        for (table, key, _), (count, _) in zip(tables, usage):
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE {key} IN (SELECT {key} FROM {table} ORDER BY last_used LIMIT ?)",
+                (count - int(count * keep),),
+            )
+
+    def stats(self) -> dict:
+        return {
+            "files_hit": self.hits, "files_missed": self.misses, "hit_rate": round(self.hit_rate, 4),
+            "pages_hit": self.page_hits, "pages_missed": self.page_misses,
+            "page_hit_rate": round(self.page_hit_rate, 4),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_parse_cache():
+    """Shared cache at PARSE_CACHE_PATH, or None when caching is disabled."""
+    global _default_cache
+    if not PARSE_CACHE_PATH:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache(PARSE_CACHE_PATH)
+        return _default_cache
@@ -1,42 +1,317 @@
 import fitz 
+import hashlib
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def parse_pdf_text_chunks(pdf_path, max_chunk_size=700):
+from .chunker import chunk_pages
+from .config import (
+    PARSE_WORKERS, PARSE_PAGES_PER_TASK, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, PARSE_CACHE_PAGE_HASH_MB,
+    OCR_WORKERS, OCR_LANGUAGE, OCR_DPI, OCR_MIN_CHARS, OCR_PAGES_PER_TASK, STRIP_BOILERPLATE,
+)
+from .dedup import strip_boilerplate
+from .parse_cache import default_parse_cache
+from .profiling import span
 
+
+def iter_page_texts(pdf_path):
+    """Yield (page_number, text) for each page, one page in memory at a time."""
     doc = fitz.open(pdf_path)
-    full_text = ""
-    for page in doc:
-        full_text += page.get_text()
-    doc.close()
+    try:
+        for page in doc:
+            yield page.number + 1, page.get_text()
+    finally:
+        doc.close()
 
 
-    paragraphs = [p.strip() for p in full_text.split('\n') if p.strip()]
-    chunks = []
-    current_chunk = ""
+def document_pages(pages):
+    """Pages ready for chunking: running headers and footers removed unless STRIP_BOILERPLATE is off."""
+    return strip_boilerplate(pages) if STRIP_BOILERPLATE else pages
 
-    for para in paragraphs:
-        if len(current_chunk) + len(para) < max_chunk_size:
-            current_chunk += para + "\n"
-        else:
-            chunks.append(current_chunk.strip())
-            current_chunk = para + "\n"
 
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+def parse_pdf_chunks(pdf_path, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """Token-aware chunks of a PDF, each carrying its page range and character offsets."""
+    return chunk_pages(document_pages(load_pages(pdf_path)), max_tokens, overlap_tokens)
 
-    return chunks
 
+@span("parse.extract")
+def _extract_pages(pdf_path, indices):
+    """Text-layer pages for indices, plus the numbers of pages that look scanned."""
+    doc = fitz.open(pdf_path)
+    try:
+        pages, scanned = [], []
+        for i in indices:
+            page = doc[i]
+            text = page.get_text()
+            # Next to no text but an image: a scan that needs OCR.
+            if len(text.strip()) < OCR_MIN_CHARS and page.get_images():
+                scanned.append(i + 1)
+            pages.append((i + 1, text))
+        return pages, scanned
+    finally:
+        doc.close()
 
-def parse_multiple_pdfs(file_paths, progressbar=None):
 
-    result = {}
+def _ocr_pages(pdf_path, numbers, language=OCR_LANGUAGE, dpi=OCR_DPI):
+    doc = fitz.open(pdf_path)
+    try:
+        pages = []
+        for number in numbers:
+            page = doc[number - 1]
+            textpage = page.get_textpage_ocr(language=language, dpi=dpi, full=True)
+            pages.append((number, page.get_text(textpage=textpage)))
+        return pages
+    finally:
+        doc.close()
+
+
+_ocr_ready = None
+
+
+def ocr_available() -> bool:
+    """True when PyMuPDF can find Tesseract's language data."""
+    global _ocr_ready
+    if _ocr_ready is None:
+        try:
+            fitz.get_tessdata()
+            _ocr_ready = True
+        except Exception:
+            _ocr_ready = False
+    return _ocr_ready
+
+
+class _OcrLane:
+    """A separate process pool that OCRs scanned pages while text extraction carries on."""
+
+    def __init__(self, workers=OCR_WORKERS, pages_per_task=OCR_PAGES_PER_TASK):
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.pages = 0
+        self._pool = None
+        self._started = None
+        self._finished = None
+
+    def submit(self, pdf_path, numbers):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._started = time.perf_counter()
+        self.pages += len(numbers)
+        futures = [
+            self._pool.submit(_ocr_pages, pdf_path, numbers[start:start + self.pages_per_task])
+            for start in range(0, len(numbers), self.pages_per_task)
+        ]
+        for future in futures:
+            future.add_done_callback(self._done)
+        return futures
+
+    def _done(self, _):
+        self._finished = time.perf_counter()
+
+    @property
+    def rate(self) -> float:
+        if self._started is None or self._finished is None:
+            return 0.0
+        return self.pages / max(self._finished - self._started, 1e-9)
+
+    def close(self, cancel=False):
+        if self._pool is not None:
+            self._pool.shutdown(wait=not cancel, cancel_futures=cancel)
+
+
+def _page_hash(doc, page):
+    # The content stream plus the page dictionary (which names its fonts,
+    # images and forms) identifies what get_text() would see.
+    digest = hashlib.sha256(page.read_contents())
+    digest.update(doc.xref_object(page.xref, compressed=True).encode())
+    return digest.hexdigest()
+
+
+class _Plan:
+    """What still has to be extracted for one file after the cache was consulted."""
+
+    __slots__ = ("path", "pages", "missing", "page_hashes")
+
+    def __init__(self, path, pages, missing, page_hashes=None):
+        self.path = path
+        self.pages = pages
+        self.missing = missing
+        self.page_hashes = page_hashes
+
+    def merge(self, extracted, cache):
+        # Later entries win, so OCR text passed after the text layer replaces it.
+        for number, text in extracted:
+            self.pages[number - 1] = (number, text)
+        if cache is not None:
+            cache.store(self.path, self.pages, self.page_hashes)
+        return self.pages
+
+
+def _plan(pdf_path, cache):
+    """Look pdf_path up in the cache; on a miss, find the pages that must be extracted.
+
+    A hit never opens the PDF. Files of PARSE_CACHE_PAGE_HASH_MB or more
+    also reuse any unchanged pages by their content hash.
+    """
+    if cache is not None:
+        pages = cache.lookup(pdf_path)
+        if pages is not None:
+            return _Plan(pdf_path, pages, [])
+
+    doc = fitz.open(pdf_path)
+    try:
+        page_count = doc.page_count
+        if cache is None or os.path.getsize(pdf_path) < PARSE_CACHE_PAGE_HASH_MB * 1024 * 1024:
+            return _Plan(pdf_path, [None] * page_count, list(range(page_count)))
+        page_hashes = [_page_hash(doc, page) for page in doc]
+    finally:
+        doc.close()
+
+    known = cache.page_texts(page_hashes)
+    pages = [(i + 1, known[h]) if h in known else None for i, h in enumerate(page_hashes)]
+    missing = [i for i, page in enumerate(pages) if page is None]
+    return _Plan(pdf_path, pages, missing, page_hashes)
+
+
+def load_pages(pdf_path, cache=None):
+    """All (page_number, text) pairs of a PDF, from the parse cache when possible.
+
+    Scanned pages are OCRed in-process when Tesseract is available.
+    """
+    cache = cache or default_parse_cache()
+    plan = _plan(pdf_path, cache)
+    pages, scanned = _extract_pages(pdf_path, plan.missing) if plan.missing else ([], [])
+    if scanned:
+        if not (OCR_WORKERS and ocr_available()):
+            # Don't cache text we know is incomplete.
+            return plan.merge(pages, None)
+        pages += _ocr_pages(pdf_path, scanned)
+    return plan.merge(pages, cache)
+
+
+def _extract_in_pool(file_paths, workers, pages_per_task, progressbar, cache):
+    # Large files are split into page ranges so a single long PDF is spread
+    # across workers instead of holding up the batch. Each file is yielded as
+    # soon as its own ranges are done, so its OCR can start while other
+    # files are still being extracted.
+    plans = [_plan(path, cache) for path in file_paths]
+    tasks = []
+    for file_idx, plan in enumerate(plans):
+        for start in range(0, len(plan.missing), pages_per_task):
+            tasks.append((file_idx, plan.missing[start:start + pages_per_task]))
+
+    total_pages = sum(len(indices) for _, indices in tasks) or 1
+    extracted = [[] for _ in file_paths]
+    scanned = [[] for _ in file_paths]
+    remaining = [0] * len(file_paths)
+    for file_idx, _ in tasks:
+        remaining[file_idx] += 1
+    done_pages = 0
+
+    for file_idx, plan in enumerate(plans):
+        if not remaining[file_idx]:
+            yield plan, [], []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_extract_pages, file_paths[file_idx], indices): (file_idx, indices)
+            for file_idx, indices in tasks
+        }
+        try:
+            for future in as_completed(futures):
+                file_idx, indices = futures[future]
+                pages, file_scanned = future.result()
+                extracted[file_idx].extend(pages)
+                scanned[file_idx].extend(file_scanned)
+                done_pages += len(indices)
+                if progressbar:
+                    progressbar.setValue(int((done_pages / total_pages) * 100))
+                remaining[file_idx] -= 1
+                if not remaining[file_idx]:
+                    yield plans[file_idx], extracted[file_idx], sorted(scanned[file_idx])
+                    extracted[file_idx] = scanned[file_idx] = None
+        except BaseException:
+            # A failed range, a progress callback that raised (e.g. a
+            # cancelled job) or a consumer that stopped early shouldn't wait
+            # for the rest of the queue.
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def _extract_sequential(file_paths, progressbar, cache):
     total = len(file_paths)
     for idx, path in enumerate(file_paths):
-        filename = os.path.basename(path)
-        chunks = parse_pdf_text_chunks(path)
-        result[filename] = chunks
+        plan = _plan(path, cache)
+        pages, scanned = _extract_pages(path, plan.missing) if plan.missing else ([], [])
+        yield plan, pages, scanned
 
         if progressbar:
             progressbar.setValue(int(((idx + 1) / total) * 100))
 
-    return result
+
+def parse_multiple_pdfs(file_paths, progressbar=None, workers=PARSE_WORKERS,
+                        pages_per_task=PARSE_PAGES_PER_TASK, max_tokens=CHUNK_MAX_TOKENS,
+                        overlap_tokens=CHUNK_OVERLAP_TOKENS, with_metadata=False, cache=None,
+                        ocr_workers=OCR_WORKERS, sources=None):
+    """Map each file name to its chunk texts, or to Chunk objects when with_metadata is set.
+
+    sources, if given, are the keys to use instead of the file names, one
+    per path (files with the same name in different folders need them).
+
+    Page texts come from the parse cache (see core.parse_cache) when the file
+    is unchanged; cache defaults to the shared one at PARSE_CACHE_PATH.
+    Scanned pages are OCRed in a separate pool of ocr_workers processes:
+    files without scans are chunked straight away, and a file with scans
+    waits only for its own OCR pages, which are merged back in page order.
+    """
+    cache = cache or default_parse_cache()
+    hits_before = cache.hits if cache is not None else 0
+    keys = dict(zip(file_paths, sources or [os.path.basename(path) for path in file_paths]))
+    if workers and workers > 1:
+        extracted = _extract_in_pool(file_paths, workers, pages_per_task, progressbar, cache)
+    else:
+        extracted = _extract_sequential(file_paths, progressbar, cache)
+
+    ocr_lane = _OcrLane(ocr_workers) if ocr_workers and ocr_available() else None
+    result = {}
+    waiting = []
+    unread = 0
+    text_pages = 0
+    started = time.perf_counter()
+
+    def finish(plan, pages, complete=True):
+        merged = plan.merge(pages, cache if complete else None)
+        with span("parse.chunk"):
+            chunks = chunk_pages(document_pages(merged), max_tokens, overlap_tokens)
+        result[keys[plan.path]] = chunks if with_metadata else [chunk.text for chunk in chunks]
+
+    try:
+        for plan, pages, scanned in extracted:
+            text_pages += len(pages)
+            if scanned and ocr_lane is not None:
+                waiting.append((plan, pages, ocr_lane.submit(plan.path, scanned)))
+            else:
+                unread += len(scanned)
+                finish(plan, pages, complete=not scanned)
+        text_seconds = time.perf_counter() - started
+
+        for plan, pages, futures in waiting:
+            finish(plan, pages + [page for future in futures for page in future.result()])
+    except BaseException:
+        if ocr_lane is not None:
+            ocr_lane.close(cancel=True)
+        raise
+    if ocr_lane is not None:
+        ocr_lane.close()
+
+    if cache is not None and file_paths:
+        hits = cache.hits - hits_before
+        print(f"📦 Parse cache: {hits}/{len(file_paths)} file(s) unchanged ({hits / len(file_paths):.0%} hit rate).")
+    if ocr_lane is not None and ocr_lane.pages:
+        print(f"🔤 Text lane: {text_pages} page(s) at {text_pages / max(text_seconds, 1e-9):.1f} pages/sec; "
+              f"🖼️ OCR lane: {ocr_lane.pages} page(s) at {ocr_lane.rate:.1f} pages/sec.")
+    if unread:
+        print(f"⚠️ {unread} scanned page(s) have no text layer and OCR is unavailable (install Tesseract).")
+
+    # Files that waited for OCR finished last; restore the input order.
+    return {keys[path]: result[keys[path]] for path in file_paths}
@@ -0,0 +1,305 @@
+# core/pipeline.py
+
+import os
+import queue
+import threading
+import time
+from itertools import groupby, islice
+
+from .chunker import chunk_pages
+from .config import (
+    COLLECTION_NAME, EMBED_BATCH_SIZE, UPLOAD_BATCH_SIZE, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, DEDUP,
+)
+from .parser import document_pages, load_pages
+from .vectors import EmbeddingBatch
+
+QUEUE_SIZE = 8
+
+_DONE = object()
+
+
+class StageStats:
+    """Items produced by one pipeline stage and the time it spent working."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return f"{self.name}: {self.items} items in {self.seconds:.2f}s ({self.rate:.1f}/s)"
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+    raise _Cancelled()
+
+
+def _drain(q, stop, waited):
+    """Yield items from q until the end marker, adding blocking time to waited[0]."""
+    while True:
+        start = time.perf_counter()
+        while True:
+            if stop.is_set():
+                raise _Cancelled()
+            try:
+                item = q.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        waited[0] += time.perf_counter() - start
+        if item is _DONE:
+            return
+        yield item
+
+
+def _run_stage(fn, inbox, outbox, stats, stop, errors):
+    waited = [0.0]
+    started = time.perf_counter()
+    try:
+        for item in fn(_drain(inbox, stop, waited)):
+            if not isinstance(item, _FileDone):
+                stats.items += len(item) if isinstance(item, (list, EmbeddingBatch)) else 1
+            put_start = time.perf_counter()
+            if outbox is not None:
+                _put(outbox, item, stop)
+            waited[0] += time.perf_counter() - put_start
+            stats.seconds = time.perf_counter() - started - waited[0]
+        if outbox is not None:
+            _put(outbox, _DONE, stop)
+    except _Cancelled:
+        pass
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        stats.seconds = time.perf_counter() - started - waited[0]
+
+
+def run_pipeline(source, stages, queue_size: int = QUEUE_SIZE) -> list:
+    """Run (name, fn) stages in threads joined by bounded queues.
+
+    Each fn takes an iterator of items from the previous stage and yields
+    items for the next one. Returns one StageStats per stage; the first
+    exception raised by any stage is re-raised after all threads stop.
+    """
+    stop = threading.Event()
+    errors = []
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    stats = [StageStats(name) for name, _ in stages]
+
+    threads = []
+    for i, (name, fn) in enumerate(stages):
+        outbox = queues[i + 1] if i + 1 < len(stages) else None
+        thread = threading.Thread(
+            target=_run_stage,
+            args=(fn, queues[i], outbox, stats[i], stop, errors),
+            name=f"d2v-{name}",
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+
+    try:
+        for item in source:
+            _put(queues[0], item, stop)
+        _put(queues[0], _DONE, stop)
+    except _Cancelled:
+        pass
+    finally:
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    return stats
+
+
+class _FileDone:
+    """Follows a file's last chunk down the pipeline; once it reaches the
+    upsert stage, everything before it has been sent."""
+
+    def __init__(self, path, source, current, stale, moved, references):
+        self.path = path
+        self.source = source
+        self.current = current
+        self.stale = stale
+        self.moved = moved
+        self.references = references
+
+
+def ingest_pdfs(file_paths, max_tokens: int = CHUNK_MAX_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+                embed_batch_size: int = EMBED_BATCH_SIZE, upsert_batch_size: int = UPLOAD_BATCH_SIZE,
+                queue_size: int = QUEUE_SIZE, client=None, dedup: bool = DEDUP, manifest=None,
+                collection: str = COLLECTION_NAME, sources=None, progress=None) -> dict:
+    """Stream PDFs through extract -> chunk -> plan -> embed -> upsert with bounded memory.
+
+    Only one file's text and chunks, a few chunk batches and a few point
+    batches are in flight at any time, so peak memory follows the batch and
+    queue sizes and the largest file rather than the size of the corpus.
+
+    Like sync_documents, each file is diffed against the manifest: only
+    changed chunks are embedded and sent, moved ones get their payload
+    updated, and once a file's points are in Qdrant its stale points are
+    deleted and the file is recorded, so an interrupted run resumes at the
+    first file it didn't finish. sources name the files (default: their file
+    names). With dedup, repeated chunks are dropped before embedding and the
+    canonical points get a "sources" list; the duplicate index keeps no
+    texts, only about 2 KB per unique chunk. progress(files_done,
+    files_total, chunks) is called as each file is recorded.
+
+    Returns the sync totals, with one StageStats per stage under "stages".
+    """
+    from .collection import ensure_collection
+    from .dedup import Deduplicator, chunk_key, format_stats
+    from .embedding import embed_texts
+    from .embedding_cache import default_cache
+    from .manifest import Manifest, delete_stale, plan_sync, refresh_shared
+    from .uploader import QdrantUploader, get_qdrant_client
+
+    file_paths = list(file_paths)
+    names = dict(zip(file_paths, sources or [os.path.basename(path) for path in file_paths]))
+    run_sources = set(names.values())
+    manifest = manifest or Manifest()
+    target = client or get_qdrant_client()
+    cache = default_cache()
+    deduplicator = Deduplicator() if dedup else None
+    totals = {"files": 0, "chunks": 0, "upserted": 0, "deleted": 0, "unchanged": 0, "moved": 0,
+              "duplicates": 0, "bytes_saved": 0}
+    signatures = {}
+    shared, disowned = set(), set()
+    dropped_text = 0
+    dim = None
+
+    def extract(paths):
+        for path in paths:
+            stat = os.stat(path)
+            signatures[path] = (stat.st_size, stat.st_mtime_ns)
+            # One file's pages at a time, from the parse cache when unchanged.
+            for page_number, text in load_pages(path):
+                yield path, page_number, text
+            # Marks the end of the file, even one without pages.
+            yield path, None, None
+
+    def chunk(pages):
+        for path, file_pages in groupby(pages, key=lambda page: page[0]):
+            pages = document_pages([(page[1], page[2]) for page in file_pages if page[1] is not None])
+            for piece in chunk_pages(pages, max_tokens, overlap_tokens):
+                yield path, piece
+            yield path, None
+
+    def plan(chunks):
+        nonlocal dropped_text
+        for path, file_chunks in groupby(chunks, key=lambda item: item[0]):
+            source = names[path]
+            pieces = [piece for _, piece in file_chunks if piece is not None]
+            totals["chunks"] += len(pieces)
+            if deduplicator is None:
+                kept, references = pieces, {}
+            else:
+                kept, references = [], {}
+                keys = [chunk_key(piece.text) for piece in pieces]
+                # Chunks stored by other files, before this run.
+                deduplicator.use_stored(manifest.stored_points(set(keys), collection, exclude=run_sources))
+                for piece, key in zip(pieces, keys):
+                    index, new = deduplicator.add(piece.text, source, key)
+                    if new:
+                        kept.append(piece)
+                        continue
+                    dropped_text += len(piece.text.encode("utf-8"))
+                    if deduplicator.owners[index] != source:
+                        references.setdefault(deduplicator.ids[index], key)
+            changed, stale, current, moved = plan_sync(manifest, source, kept, collection, references)
+            totals["unchanged"] += len(current) - len(references) - len(changed)
+            for piece in changed:
+                yield source, piece
+            yield _FileDone(path, source, current, stale, moved, references)
+
+    def embed_batch(batch):
+        vectors = embed_texts([piece.text for _, piece in batch], batch_size=embed_batch_size, cache=cache)
+        return EmbeddingBatch.from_chunks([piece for _, piece in batch], vectors, [source for source, _ in batch])
+
+    def embed(items):
+        batch, waiting = [], []
+        for item in items:
+            if isinstance(item, _FileDone):
+                # Passed on only after the batch holding the file's last chunk.
+                if batch:
+                    waiting.append(item)
+                else:
+                    yield item
+                continue
+            batch.append(item)
+            if len(batch) == embed_batch_size:
+                yield embed_batch(batch)
+                batch = []
+                yield from waiting
+                waiting = []
+        if batch:
+            yield embed_batch(batch)
+        yield from waiting
+
+    def upsert(items):
+        nonlocal dim
+        with QdrantUploader(target, collection_name=collection, batch_size=upsert_batch_size) as uploader:
+            for item in items:
+                if isinstance(item, EmbeddingBatch):
+                    if dim is None:
+                        dim = item.dim
+                        ensure_collection(target, item.dim, collection)
+                    uploader.upsert_embeddings(item)
+                    totals["upserted"] += len(item)
+                    yield item
+                    continue
+                if item.moved:
+                    uploader.set_payloads(item.moved)
+                if item.stale:
+                    totals["deleted"] += len(delete_stale(uploader, manifest, item.source, item.stale, collection,
+                                                          shared, disowned))
+                shared.update(item.references)
+                # The manifest may only move forward once Qdrant has the points.
+                uploader.flush()
+                manifest.replace(item.source, item.current, collection)
+                manifest.record_file(item.path, item.source, *signatures.pop(item.path), collection)
+                totals["moved"] += len(item.moved)
+                totals["files"] += 1
+                if progress:
+                    progress(totals["files"], len(file_paths), totals["chunks"])
+            refresh_shared(uploader, manifest, shared, disowned, collection)
+
+    stages = [("extract", extract), ("chunk", chunk), ("plan", plan), ("embed", embed), ("upsert", upsert)]
+    stage_stats = run_pipeline(file_paths, stages, queue_size=queue_size)
+
+    for stage in stage_stats:
+        print(f"⏱️ {stage}")
+    print(f"✅ Streamed {totals['files']} file(s): {totals['upserted']} upserted, "
+          f"{totals['deleted']} deleted, {totals['unchanged']} unchanged ({totals['moved']} moved).")
+    if deduplicator is not None and deduplicator.seen:
+        stats = deduplicator.stats(dropped_text)
+        totals["duplicates"] = stats["saved"]
+        totals["bytes_saved"] = stats["text_bytes_saved"] + (stats["saved"] * dim * 4 if dim else 0)
+        print(format_stats(stats, dim))
+    totals["stages"] = stage_stats
+    return totals
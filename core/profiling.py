@@ -0,0 +1,110 @@
+# core/profiling.py
+
+"""Optional timing spans and cProfile hooks for the hot paths.
+
+Core functions wrap their stages in `span("stage.name")`. Spans cost one
+flag check unless recording is on (PROFILE_SPANS=1 or enable()), in which
+case every duration is kept so a run can be summarised per stage.
+"""
+
+import contextlib
+import threading
+import time
+
+import numpy as np
+
+from .config import PROFILE_SPANS
+
+_lock = threading.Lock()
+_durations = {}
+_enabled = PROFILE_SPANS
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    with _lock:
+        _durations.clear()
+
+
+def record(name: str, seconds: float):
+    with _lock:
+        _durations.setdefault(name, []).append(seconds)
+
+
+class span(contextlib.ContextDecorator):
+    """Time a block (or a function, as a decorator) under name while spans are enabled."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = None
+
+    def _recreate_cm(self):
+        # Each decorated call (recursive or on another thread) times itself.
+        return type(self)(self.name)
+
+    def __enter__(self):
+        if _enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            record(self.name, time.perf_counter() - self.start)
+            self.start = None
+        return False
+
+
+def durations() -> dict:
+    """Raw recorded durations in seconds, by span name."""
+    with _lock:
+        return {name: list(values) for name, values in _durations.items()}
+
+
+def summary(bins: int = 10) -> dict:
+    """Count, total, percentiles and a log-spaced latency histogram (ms) per span."""
+    report = {}
+    for name, values in sorted(durations().items()):
+        ms = np.array(values) * 1000
+        low, high = max(ms.min(), 1e-3), max(ms.max(), 1e-3)
+        edges = np.geomspace(low, high * 1.0001, bins + 1) if high > low else np.array([low, low * 1.0001])
+        counts, edges = np.histogram(np.clip(ms, edges[0], edges[-1]), bins=edges)
+        report[name] = {
+            "count": len(ms),
+            "total_ms": round(float(ms.sum()), 3),
+            "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(ms, 95)), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            "max_ms": round(float(ms.max()), 3),
+            "histogram": {"edges_ms": [round(float(e), 3) for e in edges], "counts": counts.tolist()},
+        }
+    return report
+
+
+@contextlib.contextmanager
+def profile(path: str = None, top: int = 25):
+    """Run the block under cProfile; write stats to path, or print the top functions."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+            print(f"✅ Wrote profile to {path} (open with `python -m pstats {path}`).")
+        else:
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
@@ -0,0 +1,171 @@
+# core/search.py
+
+"""Semantic search over ingested chunks, in Qdrant or in a local index.
+
+Queries are embedded with the E5 "query: " prefix. The local index scores
+small collections exactly with one matrix product and switches to an IVF
+index (spherical k-means lists, probed nearest-first) for large ones. It is
+saved as a directory of .npy files that load memory-mapped.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .clustering import assign, kmeans
+from .config import COLLECTION_NAME, SEARCH_INDEX_PATH, SEARCH_IVF_THRESHOLD, SEARCH_NPROBE
+from .embedding import embed_texts
+from .vectors import EmbeddingBatch
+
+
+def embed_query(query: str) -> np.ndarray:
+    return embed_texts([query], batch_size=1, prefix="query: ")[0]
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first."""
+    if k < len(scores):
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+class LocalIndex:
+    """Vectors with their texts and sources, searchable by cosine similarity.
+
+    With an IVF index the rows are stored grouped by list, so probing a list
+    scans one contiguous slice; offsets[i]:offsets[i+1] are the rows of list i.
+    """
+
+    def __init__(self, vectors: np.ndarray, texts: list, sources: list = None,
+                 centroids: np.ndarray = None, offsets: np.ndarray = None):
+        self.vectors = vectors
+        self.texts = texts
+        self.sources = sources
+        self.centroids = centroids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.texts)
+
+    @property
+    def is_ivf(self) -> bool:
+        return self.centroids is not None
+
+    @classmethod
+    def build(cls, embeddings: EmbeddingBatch, ivf_threshold: int = SEARCH_IVF_THRESHOLD, lists: int = None):
+        """Index an EmbeddingBatch; IVF is used from ivf_threshold vectors up."""
+        vectors, texts, sources = embeddings.vectors, list(embeddings.texts), embeddings.sources
+        if len(vectors) < ivf_threshold:
+            return cls(vectors, texts, list(sources) if sources is not None else None)
+
+        lists = lists or max(1, int(4 * np.sqrt(len(vectors))))
+        centroids = kmeans(vectors, lists)
+        assignment = assign(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.zeros(lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=lists), out=offsets[1:])
+        return cls(
+            np.ascontiguousarray(vectors[order]),
+            [texts[i] for i in order.tolist()],
+            [sources[i] for i in order.tolist()] if sources is not None else None,
+            centroids, offsets,
+        )
+
+    @classmethod
+    def from_qdrant(cls, client=None, collection_name: str = COLLECTION_NAME, batch_size: int = 1024, **kwargs):
+        """Build an index from every point of a Qdrant collection."""
+        from .config import QDRANT_VECTOR_NAME
+        from .uploader import get_qdrant_client
+
+        client = client or get_qdrant_client()
+        texts, sources, vectors = [], [], []
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=["text", "source"],
+                with_vectors=[QDRANT_VECTOR_NAME] if QDRANT_VECTOR_NAME else True,
+            )
+            for point in points:
+                payload = point.payload or {}
+                texts.append(payload.get("text", ""))
+                sources.append(payload.get("source"))
+                vectors.append(point.vector[QDRANT_VECTOR_NAME] if QDRANT_VECTOR_NAME else point.vector)
+            if offset is None:
+                break
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        return cls.build(EmbeddingBatch(texts, matrix, sources), **kwargs)
+
+    def search_vector(self, vector: np.ndarray, k: int = 5, nprobe: int = SEARCH_NPROBE) -> list:
+        """Return up to k hits for an embedded query, best first."""
+        if not len(self):
+            return []
+        if self.is_ivf:
+            probes = _top_k(self.centroids @ vector, nprobe)
+            rows = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in probes.tolist()])
+            scores = self.vectors[rows] @ vector
+            best = rows[_top_k(scores, k)]
+            best_scores = self.vectors[best] @ vector
+        else:
+            scores = self.vectors @ vector
+            best = _top_k(scores, k)
+            best_scores = scores[best]
+        return [
+            {"score": float(score), "text": self.texts[row],
+             "source": self.sources[row] if self.sources is not None else None}
+            for row, score in zip(best.tolist(), best_scores.tolist())
+        ]
+
+    def save(self, path: str = SEARCH_INDEX_PATH):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self.vectors)
+        if self.is_ivf:
+            np.save(os.path.join(path, "centroids.npy"), self.centroids)
+            np.save(os.path.join(path, "offsets.npy"), self.offsets)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"texts": self.texts, "sources": self.sources}, f, ensure_ascii=False)
+        print(f"✅ Saved local index of {len(self)} vectors to {path}.")
+
+    @classmethod
+    def load(cls, path: str = SEARCH_INDEX_PATH):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        centroids = offsets = None
+        if os.path.exists(os.path.join(path, "centroids.npy")):
+            centroids = np.load(os.path.join(path, "centroids.npy"))
+            offsets = np.load(os.path.join(path, "offsets.npy"))
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        return cls(vectors, meta["texts"], meta["sources"], centroids, offsets)
+
+
+def search(query: str, k: int = 5, index: LocalIndex = None, client=None,
+           collection_name: str = COLLECTION_NAME, source: str = None, page: int = None) -> list:
+    """Return the k chunks closest to query as {"score", "text", "source", "page"} dicts.
+
+    Searches the local index when one is given, otherwise Qdrant, where
+    results can be restricted to one source file and/or page.
+    """
+    if index is not None and (source or page is not None):
+        raise ValueError("Filtering by source or page needs Qdrant; the local index has no payloads.")
+    vector = embed_query(query)
+    if index is not None:
+        return [dict(hit, page=None) for hit in index.search_vector(vector, k)]
+
+    from .collection import payload_filter
+    from .config import QDRANT_VECTOR_NAME
+    from .uploader import get_qdrant_client
+
+    client = client or get_qdrant_client()
+    response = client.query_points(collection_name=collection_name, query=vector.tolist(),
+                                   using=QDRANT_VECTOR_NAME or None, query_filter=payload_filter(source, page),
+                                   limit=k, with_payload=["text", "source", "page_start"])
+    return [
+        {"score": point.score, "text": (point.payload or {}).get("text", ""),
+         "source": (point.payload or {}).get("source"), "page": (point.payload or {}).get("page_start")}
+        for point in response.points
+    ]
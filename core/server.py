@@ -0,0 +1,259 @@
+# core/server.py
+
+"""Local embedding service: `d2v serve`.
+
+A small asyncio HTTP server on top of core.embedding. Requests that arrive
+within a few milliseconds of each other are embedded as one batch, and
+recent (prefix, text) pairs are answered from an in-memory LRU cache.
+
+    POST /embed    {"texts": ["..."], "prefix": "query: "}  ->  {"vectors": [[...], ...]}
+    GET  /metrics  request count, QPS, p50/p99 latency, cache and batch stats
+    GET  /health
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .config import QUERY_CACHE_SIZE, SERVER_BATCH_WINDOW_MS, SERVER_HOST, SERVER_MAX_BATCH, SERVER_PORT
+from .embedding import embed_texts
+
+_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class LRUCache:
+    """Fixed-size mapping that forgets the least recently used entry first."""
+
+    def __init__(self, capacity: int = QUERY_CACHE_SIZE):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Metrics:
+    """Latency percentiles and QPS over the most recent requests."""
+
+    def __init__(self, window: int = 10000):
+        self._latencies = deque(maxlen=window)
+        self._finished = deque(maxlen=window)
+        self.requests = 0
+        self.batches = 0
+        self.batched_texts = 0
+
+    def record(self, seconds: float):
+        self.requests += 1
+        self._latencies.append(seconds)
+        self._finished.append(time.perf_counter())
+
+    def snapshot(self) -> dict:
+        latencies = np.array(self._latencies) * 1000 if self._latencies else np.zeros(1)
+        now = time.perf_counter()
+        recent = [t for t in self._finished if now - t <= 10.0]
+        # QPS over the last 10 seconds, or over the burst if it was shorter.
+        span = now - recent[0] if len(recent) > 1 else 10.0
+        return {
+            "requests": self.requests,
+            "qps": round(len(recent) / max(span, 1e-3), 2),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "batches": self.batches,
+            "mean_batch": round(self.batched_texts / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class MicroBatcher:
+    """Collects texts for up to window_ms and embeds them in one forward pass."""
+
+    def __init__(self, window_ms: float = SERVER_BATCH_WINDOW_MS, max_batch: int = SERVER_MAX_BATCH,
+                 cache: LRUCache = None, metrics: Metrics = None):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.cache = cache if cache is not None else LRUCache()
+        self.metrics = metrics or Metrics()
+        self._queue = asyncio.Queue()
+        # The model runs on one thread; the event loop keeps accepting requests.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="d2v-embed")
+
+    async def embed(self, texts: list, prefix: str) -> list:
+        """float32 vectors of texts, from the cache or the next batch."""
+        loop = asyncio.get_running_loop()
+        results = [self.cache.get((prefix, text)) for text in texts]
+        pending = []
+        for i, vector in enumerate(results):
+            if vector is None:
+                future = loop.create_future()
+                self._queue.put_nowait((prefix, texts[i], future))
+                pending.append((i, future))
+        for i, future in pending:
+            results[i] = await future
+        return results
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._embed_batch(batch)
+
+    async def _embed_batch(self, batch):
+        # Identical texts in one window are embedded once.
+        groups = {}
+        for prefix, text, future in batch:
+            groups.setdefault(prefix, {}).setdefault(text, []).append(future)
+        loop = asyncio.get_running_loop()
+        for prefix, waiting in groups.items():
+            texts = list(waiting)
+            try:
+                vectors = await loop.run_in_executor(self._executor, embed_texts, texts, len(texts), prefix)
+            except Exception as e:
+                for futures in waiting.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(e)
+                continue
+            self.metrics.batches += 1
+            self.metrics.batched_texts += len(texts)
+            for text, vector in zip(texts, vectors):
+                # A float32 copy (3 KB at 768 dims, not the batch it came from);
+                # it becomes JSON floats only when a response is written.
+                vector = np.array(vector, dtype=np.float32)
+                self.cache.put((prefix, text), vector)
+                for future in waiting[text]:
+                    if not future.done():
+                        future.set_result(vector)
+
+
+class EmbeddingServer:
+    def __init__(self, host: str = SERVER_HOST, port: int = SERVER_PORT, **batcher_options):
+        self.host = host
+        self.port = port
+        self.batcher_options = batcher_options
+        self.batcher = None
+
+    async def _respond(self, writer, status: int, body: dict, keep_alive: bool):
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {_STATUS[status]}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+
+    async def _route(self, method: str, path: str, body: bytes):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            cache = self.batcher.cache
+            return 200, {**self.batcher.metrics.snapshot(), "cache_size": len(cache),
+                         "cache_hits": cache.hits, "cache_misses": cache.misses}
+        if path != "/embed":
+            return 404, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            request = json.loads(body or b"{}")
+            texts = request["texts"] if "texts" in request else [request["text"]]
+            prefix = request.get("prefix", "query: ")
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise TypeError("texts must be a list of strings")
+            if not isinstance(prefix, str):
+                raise TypeError("prefix must be a string")
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": 'expected {"texts": [...]} or {"text": "..."}'}
+        vectors = await self.batcher.embed(texts, prefix)
+        return 200, {"vectors": [vector.tolist() for vector in vectors]}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 400, {"error": "request head too large"}, keep_alive=False)
+                    break
+                except asyncio.IncompleteReadError:
+                    break
+                started = time.perf_counter()
+                lines = head.decode("latin-1").split("\r\n")
+                headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+                try:
+                    method, path, _ = lines[0].split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    # The body cannot be skipped reliably, so the connection ends here.
+                    await self._respond(writer, 400, {"error": "malformed request"}, keep_alive=False)
+                    break
+                try:
+                    body = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    # The client hung up before sending the whole body.
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    status, response = await self._route(method, path.split("?", 1)[0], body)
+                except Exception as e:
+                    status, response = 500, {"error": str(e)}
+                await self._respond(writer, status, response, keep_alive)
+                if path.startswith("/embed"):
+                    self.batcher.metrics.record(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self.batcher = MicroBatcher(**self.batcher_options)
+        batching = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"✅ Embedding server listening on http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batching.cancel()
+
+
+def serve(host: str = SERVER_HOST, port: int = SERVER_PORT, **batcher_options):
+    """Load the model and serve embeddings until interrupted."""
+    from .backends import warm_up
+
+    warm_up()
+    try:
+        asyncio.run(EmbeddingServer(host, port, **batcher_options).serve())
+    except KeyboardInterrupt:
+        pass
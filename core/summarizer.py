@@ -1,2 +1,122 @@
-def summarize_chunks(chunks):
-    return "\n\n".join([f"📝 Summary of chunk {i+1}: {chunk[:100]}..." for i, chunk in enumerate(chunks)])
+# core/summarizer.py
+
+"""Extractive summaries built from the chunk embeddings we already have.
+
+A chunk's centrality is its mean cosine similarity to every other chunk of
+the same document. With normalised vectors that is V @ mean(V), one
+matrix-vector product instead of the full n x n similarity matrix. The
+summary is the most central chunks, picked with MMR so they don't repeat
+each other; documents larger than SUMMARY_KMEANS_THRESHOLD chunks are
+clustered instead and each cluster contributes its most central chunk.
+"""
+
+import re
+
+import numpy as np
+
+from .clustering import assign, kmeans
+from .config import SUMMARY_CHUNKS, SUMMARY_EXCERPT_CHARS, SUMMARY_KMEANS_THRESHOLD, SUMMARY_MMR_DIVERSITY
+from .profiling import span
+
+_SENTENCE_END = re.compile(r"[.!?。！？](?=\s|$)")
+
+
+def centrality(vectors: np.ndarray) -> np.ndarray:
+    """Mean cosine similarity of each row to all rows (rows must be normalised)."""
+    return vectors @ vectors.mean(axis=0)
+
+
+def _mmr(vectors: np.ndarray, k: int, diversity: float, chosen: list = None) -> list:
+    """MMR picks up to k rows, continuing from chosen if given."""
+    relevance = centrality(vectors)
+    chosen = list(chosen) if chosen else [int(np.argmax(relevance))]
+    # Similarity of every row to its closest already chosen row.
+    closest = (vectors @ vectors[chosen].T).max(axis=1)
+    while len(chosen) < k:
+        scores = (1 - diversity) * relevance - diversity * closest
+        scores[chosen] = -np.inf
+        best = int(np.argmax(scores))
+        chosen.append(best)
+        np.maximum(closest, vectors @ vectors[best], out=closest)
+    return chosen
+
+
+def _cluster_representatives(vectors: np.ndarray, k: int) -> list:
+    centroids = kmeans(vectors, k)
+    assignment = assign(vectors, centroids)
+    scores = np.einsum("ij,ij->i", vectors, centroids[assignment])
+    order = np.lexsort((-scores, assignment))
+    _, firsts = np.unique(assignment[order], return_index=True)
+    return order[firsts].tolist()
+
+
+def select_chunks(vectors: np.ndarray, k: int = SUMMARY_CHUNKS, method: str = "auto",
+                  diversity: float = SUMMARY_MMR_DIVERSITY) -> list:
+    """Indices of the k chunks that best summarise vectors, in document order.
+
+    method is "centrality" (top k by centrality), "mmr" or "kmeans"; "auto"
+    uses MMR below SUMMARY_KMEANS_THRESHOLD rows and k-means above it.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) <= k:
+        return list(range(len(vectors)))
+    if method == "auto":
+        method = "kmeans" if len(vectors) >= SUMMARY_KMEANS_THRESHOLD else "mmr"
+    if method == "centrality":
+        scores = centrality(vectors)
+        picked = np.argpartition(scores, -k)[-k:].tolist()
+    elif method == "mmr":
+        picked = _mmr(vectors, k, diversity)
+    elif method == "kmeans":
+        picked = _cluster_representatives(vectors, k)
+        if len(picked) < k:
+            # Repeated chunks collapse clusters; MMR fills up the rest.
+            picked = _mmr(vectors, k, diversity, chosen=picked)
+    else:
+        raise ValueError(f"Unknown summary method {method!r}.")
+    return sorted(picked)
+
+
+def excerpt(text: str, max_chars: int = SUMMARY_EXCERPT_CHARS) -> str:
+    """Text cut to whole sentences within max_chars (or hard-cut if the first sentence is longer)."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    ends = [match.end() for match in _SENTENCE_END.finditer(text, 0, max_chars + 1)]
+    if ends:
+        return text[:ends[-1]]
+    return text[:max_chars].rstrip() + "…"
+
+
+def summarize_embeddings(embeddings, k: int = SUMMARY_CHUNKS, method: str = "auto",
+                         max_chars: int = SUMMARY_EXCERPT_CHARS) -> dict:
+    """Return {source: [excerpt, ...]} with at most k excerpts per document."""
+    groups = {}
+    for row, source in enumerate(embeddings.sources):
+        groups.setdefault(source, []).append(row)
+
+    summaries = {}
+    with span("summarize"):
+        for source, rows in groups.items():
+            rows = np.asarray(rows)
+            picked = select_chunks(embeddings.vectors[rows], k, method)
+            summaries[source] = [excerpt(embeddings.texts[rows[i]], max_chars) for i in picked]
+    return summaries
+
+
+def format_summary(summaries: dict) -> str:
+    sections = []
+    for source, excerpts in summaries.items():
+        lines = [f"📄 {source or 'Document'}"] + [f"• {text}" for text in excerpts]
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def summarize_chunks(chunks, embeddings=None, sources=None, k: int = SUMMARY_CHUNKS) -> str:
+    """Summary text for chunks, reusing their embeddings when given."""
+    if embeddings is None or list(embeddings.texts) != list(chunks):
+        from .embedding import generate_embeddings_for_chunks
+
+        # Cached vectors come straight back from the embedding cache.
+        embeddings = generate_embeddings_for_chunks(list(chunks), sources=sources)
+    return format_summary(summarize_embeddings(embeddings, k))
@@ -0,0 +1,199 @@
+# core/uploader.py
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .config import (
+    QDRANT_URL, QDRANT_API_KEY, QDRANT_PREFER_GRPC, COLLECTION_NAME,
+    UPLOAD_BATCH_SIZE, UPLOAD_MAX_BATCH_MB, UPLOAD_WORKERS, UPLOAD_RETRIES,
+)
+from .collection import point_vectors
+from .profiling import span
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_qdrant_client():
+    """Process-wide client, created on first use and reused afterwards."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from qdrant_client import QdrantClient
+
+            _client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY or None, prefer_grpc=QDRANT_PREFER_GRPC)
+        return _client
+
+
+def is_local(client) -> bool:
+    """Whether client runs qdrant-client's in-process mode (":memory:" or a path)."""
+    from qdrant_client.local.qdrant_local import QdrantLocal
+
+    return isinstance(getattr(client, "_client", None), QdrantLocal)
+
+
+class QdrantUploader:
+    """Send points to one collection in batches through a bounded pool of workers.
+
+    Failed requests are retried with exponential backoff. Call flush() (or
+    leave the with-block) to wait for outstanding batches; the first error
+    that survives all retries is raised there.
+    """
+
+    def __init__(self, client=None, collection_name: str = COLLECTION_NAME,
+                 batch_size: int = UPLOAD_BATCH_SIZE, max_batch_bytes: int = UPLOAD_MAX_BATCH_MB * 1024 * 1024,
+                 workers: int = UPLOAD_WORKERS, max_retries: int = UPLOAD_RETRIES, backoff: float = 0.5):
+        self.client = client or get_qdrant_client()
+        if is_local(self.client):
+            # Local mode is not thread-safe: concurrent upserts corrupt its arrays.
+            workers = 1
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.points_sent = 0
+        self.batches_sent = 0
+        self.retries = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="d2v-upload")
+        # At most two batches queued per worker, so a fast producer can't
+        # pile up the whole corpus in memory.
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._lock = threading.Lock()
+        self._futures = []
+        self._started = None
+        self._finished = None
+        # Stamped on every point this uploader sends, for filtering by ingest date.
+        self.ingested_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    @property
+    def rate(self) -> float:
+        if self._started is None:
+            return 0.0
+        elapsed = (self._finished or time.perf_counter()) - self._started
+        return self.points_sent / elapsed if elapsed else 0.0
+
+    def _rows_per_request(self, dim: int, avg_text: float) -> int:
+        row_bytes = 4 * dim + avg_text + 64
+        return max(1, min(self.batch_size, int(self.max_batch_bytes // row_bytes)))
+
+    def upsert_embeddings(self, embeddings):
+        """Send an EmbeddingBatch; rows are converted for the wire one request at a time."""
+        if not len(embeddings):
+            return
+        avg_text = sum(len(text) for text in embeddings.texts) / len(embeddings)
+        rows = self._rows_per_request(embeddings.dim, avg_text)
+        for start in range(0, len(embeddings), rows):
+            self._submit(self._send_embeddings, embeddings[start:start + rows])
+
+    def upsert_columns(self, ids: list, vectors, payloads: list):
+        """Send parallel ids, vector rows (any array, e.g. a memmap slice) and payloads."""
+        if not len(ids):
+            return
+        avg_text = sum(len(payload.get("text", "")) for payload in payloads) / len(payloads)
+        rows = self._rows_per_request(vectors.shape[1], avg_text)
+        for start in range(0, len(ids), rows):
+            end = start + rows
+            self._submit(self._send_columns, (ids[start:end], vectors[start:end], payloads[start:end]))
+
+    def delete(self, ids: list):
+        for start in range(0, len(ids), self.batch_size):
+            self._submit(self._send_delete, ids[start:start + self.batch_size])
+
+    def set_payload(self, payload: dict, ids: list):
+        """Merge payload into the existing points ids (their vectors are not resent)."""
+        for start in range(0, len(ids), self.batch_size):
+            self._submit(self._send_set_payload, (payload, ids[start:start + self.batch_size]))
+
+    def set_payloads(self, updates: list):
+        """Merge a different payload into each point, given as [(point_id, payload)]."""
+        for start in range(0, len(updates), self.batch_size):
+            self._submit(self._send_set_payloads, updates[start:start + self.batch_size])
+
+    def _submit(self, fn, batch):
+        if self._started is None:
+            self._started = time.perf_counter()
+        self._finished = None
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(self._with_retries, fn, batch)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._futures.append(future)
+            # Drop finished batches as we go, surfacing a failed one early
+            # instead of only at flush().
+            while self._futures and self._futures[0].done():
+                error = self._futures.pop(0).exception()
+                if error is not None:
+                    raise error
+
+    def _with_retries(self, fn, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with span("upload.request"):
+                    return fn(batch)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    def _send_embeddings(self, embeddings):
+        self._send_columns((embeddings.point_ids(), embeddings.vectors, embeddings.payloads()))
+
+    def _send_columns(self, columns):
+        from qdrant_client.models import Batch
+
+        ids, vectors, payloads = columns
+        payloads = [{**payload, "ingested_at": self.ingested_at} for payload in payloads]
+        batch = Batch(ids=ids, vectors=point_vectors(np.asarray(vectors, dtype=np.float32).tolist()), payloads=payloads)
+        self.client.upsert(collection_name=self.collection_name, points=batch, wait=True)
+        with self._lock:
+            self.points_sent += len(ids)
+            self.batches_sent += 1
+
+    def _send_delete(self, ids):
+        from qdrant_client.models import PointIdsList
+
+        self.client.delete(collection_name=self.collection_name, points_selector=PointIdsList(points=ids), wait=True)
+
+    def _send_set_payload(self, batch):
+        payload, ids = batch
+        self.client.set_payload(collection_name=self.collection_name, payload=payload, points=ids, wait=True)
+
+    def _send_set_payloads(self, updates):
+        from qdrant_client.models import SetPayload, SetPayloadOperation
+
+        operations = [SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[pid]))
+                      for pid, payload in updates]
+        self.client.batch_update_points(collection_name=self.collection_name, update_operations=operations, wait=True)
+
+    def flush(self):
+        with self._lock:
+            futures, self._futures = self._futures, []
+        errors = [f.exception() for f in futures]
+        self._finished = time.perf_counter()
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,8 +1,17 @@
-from PyQt5.QtWidgets import QApplication
+import multiprocessing
 import sys
-from ui.installer import InstallerWindow
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
+
+    if len(sys.argv) > 1:
+        # Headless mode: `d2v ingest|watch|warm ...` never imports PyQt.
+        from core.cli import main
+        sys.exit(main())
+
+    from PyQt5.QtWidgets import QApplication
+    from ui.installer import InstallerWindow
+
     app = QApplication(sys.argv)
     window = InstallerWindow()
     window.show()
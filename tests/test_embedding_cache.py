@@ -0,0 +1,34 @@
+"""Warming the embedding cache from a collection (d2v warm --from-collection)."""
+import numpy as np
+from qdrant_client import QdrantClient
+
+from core.cli import warm_cache
+from core.collection import ensure_collection
+from core.embedding_cache import EmbeddingCache
+from core.uploader import QdrantUploader
+from core.vectors import EmbeddingBatch
+
+COLLECTION = "warm"
+
+
+class StandInBackend:
+    cache_key = "stand-in#int8"
+    model_name = "stand-in"
+
+    def embed(self, inputs):
+        raise AssertionError("a warmed text reached the model")
+
+
+def test_warmed_vectors_are_hit_under_the_backend_key():
+    texts = [f"chunk {i}" for i in range(300)]
+    vectors = np.random.default_rng(0).standard_normal((300, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    client = QdrantClient(":memory:")
+    ensure_collection(client, 8, COLLECTION)
+    with QdrantUploader(client, COLLECTION) as uploader:
+        uploader.upsert_embeddings(EmbeddingBatch(texts, vectors, ["a.pdf"] * len(texts)))
+    cache = EmbeddingCache(":memory:")
+
+    assert warm_cache(COLLECTION, StandInBackend(), client=client, cache=cache) == 1.0
+    cached = cache.get_many("stand-in#int8", "passage: ", texts)
+    np.testing.assert_allclose(np.stack(cached), vectors, atol=1e-6)
@@ -0,0 +1,273 @@
+"""Crash-injection tests for resumable ingestion jobs (core.jobs) against in-memory Qdrant.
+
+Embedding is replaced by a deterministic stand-in so no model is loaded;
+files are journalled with their chunks already parsed, as the GUI does.
+"""
+import zlib
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+
+import core.embedding
+import core.jobs
+import core.manifest
+import core.parse_cache
+import core.parser
+import core.uploader
+from core.chunker import Chunk
+from core.cli import ingest
+from core.jobs import JobJournal, run_job
+from core.manifest import Manifest
+from core.uploader import QdrantUploader
+from core.vectors import EmbeddingBatch
+
+DIM = 8
+COLLECTION = "jobs"
+
+
+class Crash(Exception):
+    pass
+
+
+class Faults:
+    """Counts embedded texts and sent point ids, and fails on demand."""
+
+    def __init__(self):
+        self.embedded = []
+        self.sent = []
+        self.fail_embed_after = None
+        self.fail_send_after = None
+
+    def embed(self, chunks, batch_size=None, sources=None, **kwargs):
+        if self.fail_embed_after is not None:
+            if self.fail_embed_after == 0:
+                raise Crash("embedding worker died")
+            self.fail_embed_after -= 1
+        texts = [getattr(chunk, "text", chunk) for chunk in chunks]
+        self.embedded.extend(texts)
+        vectors = np.stack([np.random.default_rng(zlib.crc32(text.encode())).standard_normal(DIM)
+                            for text in texts]).astype(np.float32)
+        return EmbeddingBatch.from_chunks(chunks, vectors, sources)
+
+    def wrap_send(self, send):
+        def send_columns(uploader, columns):
+            # Once it fails, Qdrant stays unreachable (every retry fails too).
+            if self.fail_send_after is not None:
+                if self.fail_send_after == 0:
+                    raise Crash("connection reset")
+                self.fail_send_after -= 1
+            send(uploader, columns)
+            self.sent.extend(columns[0])
+        return send_columns
+
+    def heal(self):
+        self.fail_embed_after = self.fail_send_after = None
+
+
+@pytest.fixture
+def faults(monkeypatch):
+    faults = Faults()
+    monkeypatch.setattr(core.embedding, "generate_embeddings_for_chunks", faults.embed)
+    monkeypatch.setattr(QdrantUploader, "_send_columns", faults.wrap_send(QdrantUploader._send_columns))
+    monkeypatch.setattr(core.uploader.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(core.manifest, "JOB_BATCH_SIZE", 3)
+    return faults
+
+
+@pytest.fixture
+def library(tmp_path):
+    """Three files of seven chunks each, one chunk shared by two of them."""
+    chunks_map, paths = {}, []
+    for i in range(3):
+        path = tmp_path / f"doc{i}.pdf"
+        path.write_bytes(b"%PDF-1.4 stand-in " + bytes([i]))
+        paths.append(str(path))
+        chunks = [Chunk(f"document {i} section {j} text", j + 1, j + 1, 0, 30) for j in range(7)]
+        if i < 2:
+            chunks.append(Chunk("shared appendix text", 8, 8, 0, 20))
+        chunks_map[path.name] = chunks
+    return paths, chunks_map
+
+
+def start(library):
+    paths, chunks_map = library
+    journal = JobJournal(":memory:")
+    return journal, journal.create(paths, COLLECTION, chunks_map)
+
+
+def points(client) -> dict:
+    records, _ = client.scroll(COLLECTION, limit=1000, with_payload=True)
+    return {record.id: (record.payload["source"], record.payload["text"]) for record in records}
+
+
+def clean_run(library) -> dict:
+    client = QdrantClient(":memory:")
+    journal, job_id = start(library)
+    run_job(job_id, journal, client=client, manifest=Manifest(":memory:"))
+    return points(client)
+
+
+@pytest.mark.parametrize("fail", ["send", "embed"])
+@pytest.mark.parametrize("after", [0, 2, 4, 6])
+def test_resumed_job_neither_reembeds_nor_resends(faults, library, fail, after):
+    expected = clean_run(library)
+    faults.embedded.clear()
+    faults.sent.clear()
+
+    client = QdrantClient(":memory:")
+    manifest = Manifest(":memory:")
+    journal, job_id = start(library)
+    setattr(faults, f"fail_{fail}_after", after)
+    with pytest.raises(Crash):
+        run_job(job_id, journal, client=client, manifest=manifest)
+    assert journal.job(job_id)["status"] == "interrupted"
+    embedded, acknowledged = list(faults.embedded), set(faults.sent)
+
+    faults.heal()
+    faults.embedded.clear()
+    faults.sent.clear()
+    run_job(job_id, journal, client=client, manifest=manifest)
+
+    assert not set(faults.embedded) & set(embedded)
+    assert len(embedded) + len(faults.embedded) == len({text for _, text in expected.values()})
+    assert not set(faults.sent) & acknowledged
+    assert points(client) == expected
+    assert journal.job(job_id)["status"] == "done"
+    assert journal.jobs(COLLECTION, unfinished=True) == []
+
+
+def test_finished_job_sends_nothing_again(faults, library):
+    client = QdrantClient(":memory:")
+    manifest = Manifest(":memory:")
+    journal, job_id = start(library)
+    run_job(job_id, journal, client=client, manifest=manifest)
+    faults.embedded.clear()
+    faults.sent.clear()
+
+    run_job(job_id, journal, client=client, manifest=manifest)
+
+    assert faults.embedded == []
+    assert faults.sent == []
+
+
+@pytest.fixture
+def pdfs(tmp_path, monkeypatch):
+    """A folder with one readable PDF and one corrupt one.
+
+    They are parsed without the parse cache, one chunk per page, so no tokenizer is loaded.
+    """
+    import fitz
+
+    def chunk_pages(pages, *args, **kwargs):
+        return [Chunk(text, number, number, 0, len(text)) for number, text in pages]
+
+    monkeypatch.setattr(core.parser, "chunk_pages", chunk_pages)
+    monkeypatch.setattr(core.parser, "default_parse_cache", lambda: None)
+    monkeypatch.setattr(core.parse_cache, "default_parse_cache", lambda: None)
+    folder = tmp_path / "pdfs"
+    folder.mkdir()
+
+    def write(name, text):
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), text)
+        doc.save(str(folder / name))
+        doc.close()
+        return str(folder / name)
+
+    (folder / "bad.pdf").write_bytes(b"%PDF-1.4 truncated")
+    write("good.pdf", "A readable page about pumps.")
+    return folder, write
+
+
+def test_unparseable_file_does_not_block_the_job(faults, pdfs):
+    folder, _ = pdfs
+    client = QdrantClient(":memory:")
+    manifest = Manifest(":memory:")
+    journal = JobJournal(":memory:")
+    bad, good = str(folder / "bad.pdf"), str(folder / "good.pdf")
+    job_id = journal.create([bad, good], COLLECTION)
+
+    totals = run_job(job_id, journal, client=client, manifest=manifest, workers=1)
+
+    assert totals["failed"] == 1
+    assert journal.job(job_id)["status"] == "done"
+    assert list(journal.failed(job_id)) == [bad]
+    assert {source for source, _ in points(client).values()} == {"good.pdf"}
+    assert manifest.file_signature(good, COLLECTION) is not None
+    assert manifest.file_signature(bad, COLLECTION) is None
+
+
+def test_failed_resume_does_not_stop_new_files(faults, pdfs, monkeypatch):
+    folder, write = pdfs
+    client = QdrantClient(":memory:")
+    manifest = Manifest(":memory:")
+    journal = JobJournal(":memory:")
+    stuck = journal.create([str(folder / "good.pdf")], COLLECTION)
+    journal.set_status(stuck, "interrupted", "connection reset")
+    run = core.jobs.run_job
+
+    def run_job_failing_stuck(job_id, *args, **kwargs):
+        if job_id == stuck:
+            raise Crash("still unreachable")
+        return run(job_id, *args, **kwargs)
+
+    monkeypatch.setattr(core.jobs, "run_job", run_job_failing_stuck)
+    options = dict(workers=1, collection=COLLECTION, client=client, manifest=manifest, journal=journal)
+    ingest([str(folder)], **options)
+    write("new.pdf", "A new page about valves.")
+    totals = ingest([str(folder)], **options)
+
+    assert journal.job(stuck)["status"] == "interrupted"
+    assert totals["failed"] == 1
+    assert {source for source, _ in points(client).values()} == {"good.pdf", "new.pdf"}
+
+
+def test_file_changed_while_parsing_is_picked_up_again(faults, pdfs, monkeypatch):
+    folder, write = pdfs
+    (folder / "bad.pdf").unlink()
+    good = str(folder / "good.pdf")
+    before = core.jobs._signature(good)
+    manifest = Manifest(":memory:")
+    chunk_pages = core.parser.chunk_pages
+
+    def chunk_pages_then_edit(pages, *args, **kwargs):
+        write("good.pdf", "An edited page about pumps, saved during the parse.")
+        return chunk_pages(pages, *args, **kwargs)
+
+    monkeypatch.setattr(core.parser, "chunk_pages", chunk_pages_then_edit)
+    options = dict(workers=1, collection=COLLECTION, client=QdrantClient(":memory:"), manifest=manifest,
+                   journal=JobJournal(":memory:"))
+    ingest([str(folder)], **options)
+
+    assert manifest.file_signature(good, COLLECTION) == before
+    monkeypatch.setattr(core.parser, "chunk_pages", chunk_pages)
+    assert ingest([str(folder)], **options)["files"] == 1
+
+
+def test_chunk_stored_by_an_earlier_job_is_not_stored_again(faults, library):
+    paths, chunks_map = library
+    client = QdrantClient(":memory:")
+    manifest = Manifest(":memory:")
+    journal = JobJournal(":memory:")
+    for path in paths[:2]:
+        run_job(journal.create([path], COLLECTION, chunks_map), journal, client=client, manifest=manifest)
+
+    assert faults.embedded.count("shared appendix text") == 1
+    records, _ = client.scroll(COLLECTION, limit=100, with_payload=True)
+    shared = [record.payload for record in records if record.payload["text"] == "shared appendix text"]
+    assert shared == [{**shared[0], "source": "doc0.pdf", "sources": ["doc0.pdf", "doc1.pdf"]}]
+
+
+def test_precomputed_vectors_are_not_embedded_again(faults, library):
+    _, chunks_map = library
+    expected = clean_run(library)
+    precomputed = faults.embed([chunk for chunks in chunks_map.values() for chunk in chunks])
+    faults.embedded.clear()
+
+    client = QdrantClient(":memory:")
+    journal, job_id = start(library)
+    run_job(job_id, journal, client=client, manifest=Manifest(":memory:"), precomputed=precomputed)
+
+    assert faults.embedded == []
+    assert points(client) == expected
@@ -0,0 +1,27 @@
+"""QdrantUploader against qdrant-client's local mode."""
+import numpy as np
+from qdrant_client import QdrantClient
+
+from core.chunker import Chunk
+from core.collection import ensure_collection
+from core.uploader import QdrantUploader
+from core.vectors import EmbeddingBatch
+
+COLLECTION = "uploads"
+
+
+def test_many_batches_into_memory_client():
+    # Local mode is not thread-safe, so the uploader must not send these concurrently.
+    count = 3000
+    chunks = [Chunk(f"chunk {i}", 1, 1, 0, 10) for i in range(count)]
+    vectors = np.random.default_rng(0).standard_normal((count, 8)).astype(np.float32)
+    client = QdrantClient(":memory:")
+    ensure_collection(client, 8, COLLECTION)
+
+    with QdrantUploader(client, COLLECTION, batch_size=64, workers=4) as uploader:
+        uploader.upsert_embeddings(EmbeddingBatch.from_chunks(chunks, vectors, ["a.pdf"] * count))
+
+    assert uploader.batches_sent > 1
+    assert client.count(COLLECTION).count == count
+    records, _ = client.scroll(COLLECTION, limit=count, with_payload=False)
+    assert len(records) == count
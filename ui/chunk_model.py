@@ -0,0 +1,72 @@
+import re
+from array import array
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+# Rows are handed to the view in pages as it scrolls, so the list opens
+# instantly no matter how many chunks are loaded.
+FETCH_SIZE = 500
+
+
+class ChunkListModel(QAbstractListModel):
+    """Read-only list model over the chunk store, loaded lazily and filterable in place.
+
+    The model keeps a reference to the chunk list rather than a copy; a
+    filter is just an array of matching row numbers.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._chunks = []
+        self._rows = None
+        self._loaded = 0
+
+    def set_chunks(self, chunks: list):
+        self.beginResetModel()
+        self._chunks = chunks
+        self._rows = None
+        self._loaded = min(FETCH_SIZE, len(chunks))
+        self.endResetModel()
+
+    def set_filter(self, query: str):
+        """Show only chunks containing query (case-insensitive); an empty query shows all."""
+        self.beginResetModel()
+        if query:
+            pattern = re.compile(re.escape(query), re.IGNORECASE)
+            self._rows = array("l", (i for i, chunk in enumerate(self._chunks) if pattern.search(chunk)))
+        else:
+            self._rows = None
+        self._loaded = min(FETCH_SIZE, self._visible_count())
+        self.endResetModel()
+
+    def _visible_count(self) -> int:
+        return len(self._chunks) if self._rows is None else len(self._rows)
+
+    def chunk_index(self, row: int) -> int:
+        return row if self._rows is None else self._rows[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < self._visible_count()
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(FETCH_SIZE, self._visible_count() - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        i = self.chunk_index(index.row())
+        if role == Qt.DisplayRole:
+            return f"Chunk {i+1}"
+        if role == Qt.ToolTipRole:
+            return self._chunks[i][:200]
+        if role == Qt.UserRole:
+            return i
+        return None
@@ -4,14 +4,21 @@ from dotenv import load_dotenv
 
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTabWidget, QTextEdit, QFileDialog, QListWidget, QListWidgetItem,
-    QLineEdit, QProgressBar, QApplication, QScrollArea
+    QTabWidget, QTextEdit, QFileDialog, QListView,
+    QLineEdit, QProgressBar, QApplication, QScrollArea, QComboBox, QSpinBox
 )
 from PyQt5.QtGui import QPixmap, QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThreadPool
 from core.parser import parse_multiple_pdfs
-from core.embedding import generate_embeddings_for_chunks, upload_embeddings_to_qdrant
+from core.embedding import generate_embeddings_for_chunks
+from core.config import COLLECTION_NAME
+from core.export import export_embeddings
+from core.jobs import default_journal, resume_jobs, run_job
+from core.backends import warm_up
+from core.search import LocalIndex, search
 from core.summarizer import summarize_chunks
+from ui.chunk_model import ChunkListModel
+from ui.workers import Job, describe_progress
 
 
 load_dotenv()
@@ -62,14 +69,22 @@ class MainWindow(QWidget):
         self.tabs.addTab(self._chunk_tab_ui(), "📑 Chunking")
         self.tabs.addTab(self._embedding_tab_ui(), "🧠 Embedding")
         self.tabs.addTab(self._summary_tab_ui(), "📝 Summary")
+        self.tabs.addTab(self._search_tab_ui(), "🔎 Search")
         self.tabs.addTab(self._settings_tab_ui(), "⚙️ Settings")
 
         layout.addWidget(self.tabs)
+        layout.addLayout(self._job_bar_ui())
         self.setLayout(layout)
 
         self.pdf_chunks = []
-        self.chunk_titles = []
+        self.chunks_map = {}
+        self.files = []
         self.api_key = ""
+        self.job = None
+        self.local_index = None
+
+        # Load the embedding model while the user is still picking files.
+        warm_up(background=True)
 
 
     def _upload_tab_ui(self):
@@ -93,8 +108,32 @@ class MainWindow(QWidget):
         """)
         layout.addWidget(self.upload_btn, alignment=Qt.AlignCenter)
 
+        tab.setLayout(layout)
+        return tab
+
+    def upload_pdfs(self):
+        files, _ = QFileDialog.getOpenFileNames(self, "Select PDFs", "", "PDF Files (*.pdf)")
+        if files and self._start_job(
+            lambda control: parse_multiple_pdfs(files, control, with_metadata=True),
+            lambda chunks_map: self._show_chunks(files, chunks_map),
+        ):
+            self.upload_label.setText(f"⏳ Parsing {len(files)} file(s)...")
+
+    def _show_chunks(self, files, chunks_map):
+        # Chunk objects per file (their pages go into the payloads); pdf_chunks is the flat text list.
+        self.files = files
+        self.chunks_map = chunks_map
+        self.pdf_chunks = [chunk.text for chunks in chunks_map.values() for chunk in chunks]
+        self.upload_label.setText(f"✅ Loaded {len(files)} file(s) and {len(self.pdf_chunks)} chunks.")
+        self.chunk_search.clear()
+        self.chunk_model.set_chunks(self.pdf_chunks)
+
+
+    def _job_bar_ui(self):
+        layout = QHBoxLayout()
+        layout.setSpacing(10)
+
         self.progress = QProgressBar()
-        self.progress.setVisible(False)
         self.progress.setStyleSheet("""
             QProgressBar {
                 border: 1px solid #d8b4fe;
@@ -106,26 +145,96 @@ class MainWindow(QWidget):
                 width: 20px;
             }
         """)
-        layout.addWidget(self.progress)
+        layout.addWidget(self.progress, 60)
+
+        self.job_status = QLabel("")
+        self.job_status.setStyleSheet("color: #6b21a8; font-size: 14px;")
+        layout.addWidget(self.job_status, 30)
+
+        self.pause_btn = QPushButton("⏸️ Pause")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.cancel_btn = QPushButton("✖️ Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_job)
+        for button in (self.pause_btn, self.cancel_btn):
+            button.setStyleSheet("""
+                background-color: #e9d5ff;
+                color: #4c1d95;
+                padding: 8px;
+                border-radius: 8px;
+                font-weight: bold;
+            """)
+            layout.addWidget(button)
+
+        self._set_job_bar_visible(False)
+        return layout
+
+    def _set_job_bar_visible(self, visible):
+        for widget in (self.progress, self.job_status, self.pause_btn, self.cancel_btn):
+            widget.setVisible(visible)
+
+    def _job_buttons(self):
+        return (self.upload_btn, self.embed_btn, self.upload_qdrant_btn, self.export_btn, self.resume_btn,
+                self.summary_btn, self.search_btn)
+
+    def _start_job(self, fn, on_finished, unit="%"):
+        """Run fn(control) on the thread pool so the window stays responsive.
+
+        Returns False, starting nothing, while another job is running.
+        """
+        if self.job is not None:
+            return False
+        job = Job(fn, unit)
+        # _end_job is connected first so it runs before the result handlers.
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(self._end_job)
+        job.signals.progress.connect(self._on_job_progress)
+        job.signals.finished.connect(on_finished)
+        job.signals.failed.connect(lambda message: self.job_status.setText(f"❌ {message}"))
+        job.signals.cancelled.connect(lambda: self.job_status.setText("✖️ Cancelled."))
+
+        self.job = job
+        self.progress.setValue(0)
+        self.job_status.setText("⏳ Starting...")
+        self.pause_btn.setText("⏸️ Pause")
+        self._set_job_bar_visible(True)
+        for button in self._job_buttons():
+            button.setEnabled(False)
+        QThreadPool.globalInstance().start(job)
+        return True
+
+    def _end_job(self, *_):
+        self.job = None
+        for widget in (self.progress, self.pause_btn, self.cancel_btn):
+            widget.setVisible(False)
+        self.job_status.setText("")
+        for button in self._job_buttons():
+            button.setEnabled(True)
+        self._show_resume_btn()
+
+    def _on_job_progress(self, progress):
+        total = progress["total"] or 1
+        self.progress.setValue(int(progress["done"] * 100 / total))
+        self.job_status.setText(describe_progress(progress))
+
+    def toggle_pause(self):
+        if self.job is None:
+            return
+        if self.job.control.paused:
+            self.job.control.resume()
+            self.pause_btn.setText("⏸️ Pause")
+        else:
+            self.job.control.pause()
+            self.pause_btn.setText("▶️ Resume")
+            self.job_status.setText("⏸️ Paused.")
 
-        tab.setLayout(layout)
-        return tab
+    def cancel_job(self):
+        if self.job is not None:
+            self.job.control.cancel()
+            self.job_status.setText("✖️ Cancelling...")
 
-    def upload_pdfs(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Select PDFs", "", "PDF Files (*.pdf)")
-        if files:
-            self.progress.setVisible(True)
-            self.progress.setValue(0)
-            chunks_map = parse_multiple_pdfs(files, self.progress)
-            self.pdf_chunks = [chunk for chunks in chunks_map.values() for chunk in chunks]
-            self.chunk_titles = [f"Chunk {i+1}" for i in range(len(self.pdf_chunks))]
-            self.upload_label.setText(f"✅ Loaded {len(files)} file(s) and {len(self.pdf_chunks)} chunks.")
-            self.chunk_list.clear()
-            for i, title in enumerate(self.chunk_titles):
-                item = QListWidgetItem(title)
-                item.setData(Qt.UserRole, i)
-                self.chunk_list.addItem(item)
-            self.progress.setVisible(False)
+    def closeEvent(self, event):
+        self.cancel_job()
+        super().closeEvent(event)
 
 
     def _chunk_tab_ui(self):
@@ -133,16 +242,33 @@ class MainWindow(QWidget):
         layout = QHBoxLayout()
         layout.setSpacing(10)
 
-        self.chunk_list = QListWidget()
-        self.chunk_list.itemClicked.connect(self.show_chunk_text)
+        list_layout = QVBoxLayout()
+        self.chunk_search = QLineEdit()
+        self.chunk_search.setPlaceholderText("🔍 Filter chunks...")
+        self.chunk_search.textChanged.connect(self.filter_chunks)
+        self.chunk_search.setStyleSheet("""
+            QLineEdit {
+                padding: 8px;
+                border: 2px solid #c084fc;
+                border-radius: 8px;
+            }
+        """)
+        list_layout.addWidget(self.chunk_search)
+
+        self.chunk_model = ChunkListModel(self)
+        self.chunk_list = QListView()
+        self.chunk_list.setModel(self.chunk_model)
+        self.chunk_list.setUniformItemSizes(True)
+        self.chunk_list.clicked.connect(self.show_chunk_text)
         self.chunk_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #f5f3ff;
                 padding: 10px;
                 border-radius: 8px;
             }
         """)
-        layout.addWidget(self.chunk_list, 35)
+        list_layout.addWidget(self.chunk_list)
+        layout.addLayout(list_layout, 35)
 
         self.chunk_display = QTextEdit()
         self.chunk_display.setReadOnly(True)
@@ -159,9 +285,11 @@ class MainWindow(QWidget):
         tab.setLayout(layout)
         return tab
 
-    def show_chunk_text(self, item):
-        index = item.data(Qt.UserRole)
-        self.chunk_display.setText(self.pdf_chunks[index])
+    def show_chunk_text(self, index):
+        self.chunk_display.setText(self.pdf_chunks[index.data(Qt.UserRole)])
+
+    def filter_chunks(self, query):
+        self.chunk_model.set_filter(query.strip())
 
 
     def _embedding_tab_ui(self):
@@ -185,6 +313,69 @@ class MainWindow(QWidget):
         self.embed_status.setStyleSheet("font-size: 15px; color: #6b21a8;")
         layout.addWidget(self.embed_status)
 
+        # Uploads are journalled; one that was cancelled or crashed picks up where it stopped.
+        self.resume_btn = QPushButton("⏯️ Resume Interrupted Upload")
+        self.resume_btn.setStyleSheet("""
+            background-color: #ea580c;
+            color: white;
+            padding: 10px;
+            border-radius: 8px;
+            font-weight: bold;
+        """)
+        self.resume_btn.clicked.connect(self.resume_uploads)
+        layout.addWidget(self.resume_btn)
+        self._show_resume_btn()
+
+        self.upload_qdrant_btn = QPushButton("📤 Upload to Qdrant Now")
+        self.upload_qdrant_btn.setStyleSheet("""
+            background-color: #16a34a;
+            color: white;
+            padding: 10px;
+            border-radius: 8px;
+            font-weight: bold;
+        """)
+        self.upload_qdrant_btn.clicked.connect(self.upload_embeddings)
+        self.upload_qdrant_btn.setVisible(False)
+
+        self.export_btn = QPushButton("💾 Export Embeddings")
+        self.export_btn.setStyleSheet("""
+            background-color: #7c3aed;
+            color: white;
+            padding: 10px;
+            border-radius: 8px;
+            font-weight: bold;
+        """)
+        self.export_btn.clicked.connect(self.export_embeddings)
+        self.export_btn.setVisible(False)
+
+        # One preview panel, filled in place each time embeddings are generated.
+        self.embed_preview = QScrollArea()
+        self.embed_preview.setWidgetResizable(True)
+        self.embed_preview.setVisible(False)
+        preview_content = QWidget()
+        preview_layout = QVBoxLayout(preview_content)
+        self.preview_labels = []
+        for _ in range(5):
+            chunk_label = QLabel()
+            chunk_label.setStyleSheet("padding: 10px; background-color: #ede9fe; border-radius: 8px;")
+
+            vector_label = QLabel()
+            vector_label.setStyleSheet("font-size: 13px; color: #5b21b6;")
+
+            preview_vector = QLabel()
+            preview_vector.setStyleSheet("font-size: 13px; color: #4c1d95;")
+
+            preview_layout.addWidget(chunk_label)
+            preview_layout.addWidget(vector_label)
+            preview_layout.addWidget(preview_vector)
+            preview_layout.addSpacing(10)
+            self.preview_labels.append((chunk_label, vector_label, preview_vector))
+        preview_layout.addStretch()
+        self.embed_preview.setWidget(preview_content)
+        layout.addWidget(self.embed_preview)
+        layout.addWidget(self.upload_qdrant_btn)
+        layout.addWidget(self.export_btn)
+
         tab.setLayout(layout)
         return tab
 
@@ -194,53 +385,86 @@ class MainWindow(QWidget):
             self.embed_status.setText("⚠️ No chunks available.")
             return
 
-        
-        self.embeddings = generate_embeddings_for_chunks(self.pdf_chunks)
+        chunks = [chunk for file_chunks in self.chunks_map.values() for chunk in file_chunks]
+        sources = [name for name, file_chunks in self.chunks_map.items() for _ in file_chunks]
+        if self._start_job(
+            lambda control: generate_embeddings_for_chunks(chunks, sources=sources, progress=control.report),
+            self._show_embeddings,
+            unit="chunks",
+        ):
+            self.embed_status.setText("⏳ Generating embeddings...")
+
+    def _show_embeddings(self, embeddings):
+        self.embeddings = embeddings
+        self.local_index = None
         self.embed_status.setText("✅ Embeddings generated and ready to preview/upload.")
 
-        
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_content = QWidget()
-        scroll_layout = QVBoxLayout(scroll_content)
-
-        for i, e in enumerate(self.embeddings[:5]):
-            chunk_label = QLabel(f"📄 Chunk {i+1}:\n{e['text'][:250]}...")
-            chunk_label.setStyleSheet("padding: 10px; background-color: #ede9fe; border-radius: 8px;")
-
-            vector_label = QLabel(f"📐 Vector Dimension: {len(e['embedding'])}")
-            vector_label.setStyleSheet("font-size: 13px; color: #5b21b6;")
-
-            preview_vector = QLabel(f"🧠 Vector Preview: {e['embedding'][:10]}...")
-            preview_vector.setStyleSheet("font-size: 13px; color: #4c1d95;")
-
-            scroll_layout.addWidget(chunk_label)
-            scroll_layout.addWidget(vector_label)
-            scroll_layout.addWidget(preview_vector)
-            scroll_layout.addSpacing(10)
-
-        scroll_area.setWidget(scroll_content)
-        self.tabs.widget(2).layout().addWidget(scroll_area)
-
-        
-        upload_btn = QPushButton("📤 Upload to Qdrant Now")
-        upload_btn.setStyleSheet("""
-            background-color: #16a34a;
-            color: white;
-            padding: 10px;
-            border-radius: 8px;
-            font-weight: bold;
-        """)
-        upload_btn.clicked.connect(lambda: self.upload_embeddings())
-        self.tabs.widget(2).layout().addWidget(upload_btn)
+        preview = self.embeddings[:len(self.preview_labels)]
+        for i, labels in enumerate(self.preview_labels):
+            visible = i < len(preview)
+            for label in labels:
+                label.setVisible(visible)
+            if not visible:
+                continue
+            chunk_label, vector_label, preview_vector = labels
+            vector = preview.vectors[i]
+            chunk_label.setText(f"📄 Chunk {i+1}:\n{preview.texts[i][:250]}...")
+            vector_label.setText(f"📐 Vector Dimension: {len(vector)}")
+            preview_vector.setText(f"🧠 Vector Preview: {vector[:10].round(4).tolist()}...")
+
+        self.embed_preview.setVisible(True)
+        self.upload_qdrant_btn.setVisible(True)
+        self.export_btn.setVisible(True)
 
     def upload_embeddings(self):
         if hasattr(self, 'embeddings') and self.embeddings:
-            upload_embeddings_to_qdrant(self.embeddings)
-            self.embed_status.setText("✅ Embeddings uploaded to Qdrant.")
+            # Only chunks the manifest hasn't recorded for each file are sent;
+            # chunks that disappeared from a file are deleted.
+            if self.job is not None:
+                # Busy: don't journal a job that won't run now.
+                return
+            job_id = default_journal().create(self.files, COLLECTION_NAME, self.chunks_map)
+            # The vectors from "Generate Embeddings" are sent, not computed again.
+            embeddings = self.embeddings
+            self.embed_status.setText("⏳ Uploading to Qdrant...")
+            self._start_job(
+                lambda control: run_job(job_id, progress=control.report, precomputed=embeddings),
+                self._show_upload_result,
+                unit="chunks",
+            )
         else:
             self.embed_status.setText("⚠️ No embeddings to upload.")
 
+    def resume_uploads(self):
+        if self._start_job(
+            lambda control: resume_jobs(COLLECTION_NAME, progress=control.report),
+            lambda results: self._show_upload_result(
+                {key: sum(totals[key] for totals in results) for key in ("upserted", "deleted")}
+            ),
+            unit="chunks",
+        ):
+            self.embed_status.setText("⏳ Resuming interrupted upload...")
+
+    def _show_resume_btn(self):
+        self.resume_btn.setVisible(bool(default_journal().jobs(COLLECTION_NAME, unfinished=True)))
+
+    def export_embeddings(self):
+        # For machines that can't reach Qdrant: load the folder on the DB host
+        # with `python d2v.py import <folder>`.
+        folder = QFileDialog.getExistingDirectory(self, "Export embeddings to folder")
+        if folder:
+            embeddings = self.embeddings
+            if self._start_job(
+                lambda control: export_embeddings(embeddings, folder),
+                lambda rows: self.embed_status.setText(f"✅ Exported {rows} embeddings to {folder}."),
+            ):
+                self.embed_status.setText("⏳ Exporting embeddings...")
+
+    def _show_upload_result(self, totals):
+        self.embed_status.setText(
+            f"✅ Embeddings uploaded to Qdrant ({totals['upserted']} new, {totals['deleted']} removed)."
+        )
+
 
     
     def _summary_tab_ui(self):
@@ -277,8 +501,105 @@ class MainWindow(QWidget):
         if not self.pdf_chunks:
             self.summary_display.setText("⚠️ No chunks to summarize.")
             return
-        summary = summarize_chunks(self.pdf_chunks)
-        self.summary_display.setText(summary)
+        # Reuses the vectors from the Embeddings tab; otherwise the chunks are
+        # embedded first (cheap when they are already in the embedding cache).
+        chunks = self.pdf_chunks
+        embeddings = getattr(self, 'embeddings', None)
+        sources = [name for name, file_chunks in self.chunks_map.items() for _ in file_chunks]
+        if self._start_job(
+            lambda control: summarize_chunks(chunks, embeddings=embeddings, sources=sources),
+            self.summary_display.setText,
+        ):
+            self.summary_display.setText("⏳ Summarizing...")
+
+    def _search_tab_ui(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+
+        query_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("🔎 Ask something about your documents...")
+        self.search_input.returnPressed.connect(self.run_search)
+        self.search_input.setStyleSheet("""
+            QLineEdit {
+                padding: 8px;
+                border: 2px solid #c084fc;
+                border-radius: 8px;
+            }
+        """)
+        query_layout.addWidget(self.search_input)
+
+        self.search_k = QSpinBox()
+        self.search_k.setRange(1, 100)
+        self.search_k.setValue(5)
+        self.search_k.setPrefix("Top ")
+        query_layout.addWidget(self.search_k)
+
+        self.search_target = QComboBox()
+        self.search_target.addItems(["Qdrant", "Current embeddings", "Saved local index"])
+        query_layout.addWidget(self.search_target)
+
+        self.search_btn = QPushButton("Search")
+        self.search_btn.clicked.connect(self.run_search)
+        self.search_btn.setStyleSheet("""
+            background-color: #9333ea;
+            color: white;
+            padding: 8px 16px;
+            border-radius: 8px;
+            font-weight: bold;
+        """)
+        query_layout.addWidget(self.search_btn)
+        layout.addLayout(query_layout)
+
+        self.search_results = QTextEdit()
+        self.search_results.setReadOnly(True)
+        self.search_results.setStyleSheet("""
+            QTextEdit {
+                background-color: #faf5ff;
+                padding: 15px;
+                border-radius: 10px;
+            }
+        """)
+        layout.addWidget(self.search_results)
+
+        tab.setLayout(layout)
+        return tab
+
+    def run_search(self):
+        query = self.search_input.text().strip()
+        if not query:
+            return
+        k = self.search_k.value()
+        target = self.search_target.currentText()
+        if target == "Current embeddings" and not getattr(self, "embeddings", None):
+            self.search_results.setText("⚠️ Generate embeddings first.")
+            return
+
+        def run(control):
+            index = None
+            if target == "Current embeddings":
+                if self.local_index is None:
+                    self.local_index = LocalIndex.build(self.embeddings)
+                index = self.local_index
+            elif target == "Saved local index":
+                index = LocalIndex.load()
+            return search(query, k, index=index)
+
+        if self._start_job(run, self._show_search_results):
+            self.search_results.setText("⏳ Searching...")
+
+    def _show_search_results(self, hits):
+        if not hits:
+            self.search_results.setText("No results.")
+            return
+        lines = []
+        for rank, hit in enumerate(hits, 1):
+            where = hit['source'] or ''
+            if hit.get('page') is not None:
+                where += f" p.{hit['page']}"
+            lines.append(f"{rank}. [{hit['score']:.3f}] {where}\n{hit['text']}")
+        self.search_results.setText("\n\n".join(lines))
 
     
     def _settings_tab_ui(self):
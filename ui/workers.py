@@ -0,0 +1,107 @@
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+# Progress signals are rate-limited so a job that finishes thousands of
+# batches can't flood the GUI event loop.
+PROGRESS_INTERVAL = 0.05
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobSignals(QObject):
+    progress = pyqtSignal(object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class JobControl:
+    """Shared between the GUI and a running job: progress reporting, pause and cancel.
+
+    The job calls report() (or setValue(), so it can stand in for a
+    QProgressBar); that is also where a paused job waits and a cancelled job
+    stops, by raising JobCancelled.
+    """
+
+    def __init__(self, signals: JobSignals, unit: str):
+        self._signals = signals
+        self._unit = unit
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = False
+        self._started = time.perf_counter()
+        self._paused_at = None
+        self._paused_for = 0.0
+        self._last_emit = 0.0
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def pause(self):
+        if not self.paused:
+            self._paused_at = time.perf_counter()
+            self._running.clear()
+
+    def resume(self):
+        if self.paused:
+            self._paused_for += time.perf_counter() - self._paused_at
+            self._running.set()
+
+    def cancel(self):
+        self._cancelled = True
+        self.resume()
+
+    def checkpoint(self):
+        self._running.wait()
+        if self._cancelled:
+            raise JobCancelled()
+
+    def report(self, done: int, total: int):
+        now = time.perf_counter()
+        if done >= total or now - self._last_emit >= PROGRESS_INTERVAL:
+            self._last_emit = now
+            elapsed = now - self._started - self._paused_for
+            rate = done / elapsed if elapsed > 0 else 0.0
+            eta = (total - done) / rate if rate > 0 else None
+            self._signals.progress.emit({
+                "done": done, "total": total, "unit": self._unit, "rate": rate, "eta": eta,
+            })
+        self.checkpoint()
+
+    def setValue(self, percent: int):
+        self.report(percent, 100)
+
+
+class Job(QRunnable):
+    """Runs fn(control) on a QThreadPool thread and reports back through signals."""
+
+    def __init__(self, fn, unit: str = "%"):
+        super().__init__()
+        self.fn = fn
+        self.signals = JobSignals()
+        self.control = JobControl(self.signals, unit)
+
+    def run(self):
+        try:
+            result = self.fn(self.control)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+def describe_progress(progress: dict) -> str:
+    """Human-readable 'done/total, rate, ETA' line for a progress signal."""
+    done, total, unit = progress["done"], progress["total"], progress["unit"]
+    text = f"{done}%" if unit == "%" else f"{done}/{total} {unit} · {progress['rate']:.1f} {unit}/s"
+    if progress["eta"] is not None and done < total:
+        minutes, seconds = divmod(int(progress["eta"]), 60)
+        text += f" · ETA {minutes}:{seconds:02d}"
+    return text